@@ -1,18 +1,26 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 from services.game_manager import GameManager
+from services.room_registry import RoomRegistry
+from services.worker_coordinator import WorkerCoordinator
 
 router = APIRouter()
 
-# Initialize game manager
-game_manager = GameManager()
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+# Game rooms, sharing one exchange context
+rooms = RoomRegistry()
+# Leader election, state replication and command forwarding across uvicorn workers
+cluster = WorkerCoordinator(rooms)
 
 class JoinRequest(BaseModel):
     uuid: str
 
 class JoinResponse(BaseModel):
     ball: str
+    game_id: str
 
 class StatusRequest(BaseModel):
     uuid: str
@@ -25,44 +33,166 @@ class StatusResponse(BaseModel):
     winner: str
     p0: float
     t0: int
+    cursor: int
+    version: int
+    ohlc: Optional[list] = None
+    resolution: Optional[float] = None
+
+async def get_room(game_id: Optional[str] = None, participant_uuid: Optional[str] = None) -> GameManager:
+    """
+    Resolve a room by game_id (404 if unknown)
+    Without one: the participant's own room if their uuid is given, else the default room.
+    """
+    if game_id is None:
+        return await rooms.default_room(participant_uuid)
+    room = rooms.get(game_id)
+    if room is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return room
+
+async def run_on_leader(command: str, *args, timeout: Optional[float] = None) -> JSONResponse:
+    """Run a mutating command on the leader worker (forwarded from read-only workers)"""
+    status_code, body = await cluster.run(command, *args, timeout=timeout)
+    if status_code >= 400:
+        raise HTTPException(status_code=status_code, detail=body["detail"])
+    return JSONResponse(status_code=status_code, content=body)
 
 @router.post("/join", response_model=JoinResponse)
-async def join_game(request: JoinRequest):
+@router.post("/rooms/{game_id}/join", response_model=JoinResponse)
+async def join_game(request: JoinRequest, game_id: Optional[str] = None):
     """
     Register a participant and receive a ball assignment
+    Without a game_id the participant is seated in the first room that is still filling.
+    When every room is busy the participant is queued instead: the response is 202 with
+    their position and estimated start, and they should wait on /queue/{uuid}.
     """
+    return await run_on_leader("join", request.uuid, game_id)
+
+@cluster.command("join")
+async def _join_command(participant_uuid: str, game_id: Optional[str]) -> Tuple[int, Dict]:
     try:
         # Ensure async components are initialized
-        await game_manager._ensure_async_components()
-        ball_name = await game_manager.join_game(request.uuid)
-        return JoinResponse(ball=ball_name)
-    
+        await rooms.exchange.start()
+        if game_id is None:
+            seat = await rooms.join(participant_uuid)
+            if seat is None:
+                return 202, rooms.queue_status(participant_uuid)
+            game_id, ball_name = seat
+        else:
+            game_id, ball_name = await rooms.join_room(await get_room(game_id), participant_uuid)
+        return 200, JoinResponse(ball=ball_name, game_id=game_id).model_dump()
+
+    except HTTPException as e:
+        return e.status_code, {"detail": e.detail}
+
     except ValueError as e:
-        if "Game is full" in str(e):
-            raise HTTPException(status_code=409, detail="Game is full")
+        if "Game is full" in str(e) or "All rooms are full" in str(e):
+            return 409, {"detail": str(e)}
         else:
-            raise HTTPException(status_code=400, detail=str(e))
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Internal server error")
+            return 400, {"detail": str(e)}
+
+@router.get("/queue/{uuid}")
+async def get_queue_status(
+    uuid: str,
+    timeout: float = Query(25.0, ge=0, le=60, description="Long-poll timeout in seconds"),
+):
+    """
+    Wait for a queued participant to be seated
+    Held until the participant gets a ball or the timeout passes; returns
+    {"status": "assigned", "game_id", "ball"} or {"status": "queued", "position",
+    "queue_length", "estimated_start"}.
+    """
+    return await run_on_leader("queue", uuid, timeout, timeout=timeout + cluster.forward_timeout)
+
+@cluster.command("queue")
+async def _queue_command(participant_uuid: str, timeout: float) -> Tuple[int, Dict]:
+    result = await rooms.wait_for_admission(participant_uuid, timeout)
+    if result is None:
+        return 404, {"detail": "Participant is not queued"}
+    return 200, result
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """Check whether an Accept header asks for msgpack"""
+    return bool(accept) and ("application/msgpack" in accept or "application/x-msgpack" in accept)
 
 @router.get("/status", response_model=StatusResponse)
-async def get_game_status():
+@router.get("/rooms/{game_id}/status", response_model=StatusResponse)
+async def get_game_status(
+    request: Request,
+    game_id: Optional[str] = None,
+    uuid: Optional[str] = Query(None, description="Participant uuid, to follow their own room"),
+    since: Optional[int] = Query(None, ge=0, description="Price cursor from a previous response"),
+    wait_version: Optional[int] = Query(None, ge=0, description="Hold the request until the state version exceeds this"),
+    timeout: float = Query(25.0, gt=0, le=60, description="Long-poll timeout in seconds"),
+    resolution: Optional[float] = Query(None, gt=0, description="OHLC bucket width in seconds"),
+    max_points: Optional[int] = Query(None, ge=1, le=10000, description="Maximum number of OHLC bars"),
+):
     """
     Get current game status and real-time information
+    Serves the pre-encoded snapshot and answers If-None-Match with 304.
+    With `since`, realtime_price only holds entries appended after that cursor.
+    With `wait_version`, the response is held until the state moves past that version or the timeout.
+    With `Accept: application/msgpack`, the body is msgpack and realtime_price is
+    {"timestamp": <float64 LE bytes>, "price": <float64 LE bytes>}.
+    With `resolution` or `max_points`, price history is returned as OHLC bars in `ohlc` instead.
+    Without a game_id this is the room of the participant given by `uuid`, else the
+    newest room that has started or has players.
     """
+    game_manager = await get_room(game_id, uuid)
+    if wait_version is not None:
+        await game_manager.wait_for_state_change(wait_version, timeout)
+
+    binary = wants_msgpack(request.headers.get("accept"))
+    downsampled = resolution is not None or max_points is not None
     try:
-        status_data = game_manager.get_game_status()
-        return StatusResponse(**status_data)
+        if downsampled:
+            version, body = game_manager.get_downsampled_status(resolution, max_points, binary)
+            since = None
+        else:
+            version, body = game_manager.get_status_snapshot(since, binary)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail="Internal server error")
 
+    variant = ""
+    if resolution is not None:
+        variant = f"r{resolution}"
+    elif max_points is not None:
+        variant = f"p{max_points}"
+    headers = {
+        "ETag": game_manager.status_etag(version, since, binary, variant),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    media_type = MSGPACK_MEDIA_TYPE if binary else "application/json"
+    return Response(content=body, media_type=media_type, headers=headers)
+
+@router.get("/rooms")
+async def list_rooms():
+    """
+    List the rooms with their status and player counts
+    """
+    return {"rooms": rooms.summary(), "max_rooms": rooms.max_rooms, "queued": cluster.queued()}
+
 @router.get("/game/info")
-async def get_game_info():
+@router.get("/rooms/{game_id}/info")
+async def get_game_info(game_id: Optional[str] = None, uuid: Optional[str] = None):
     """
     Get general game information (for debugging)
     """
+    game_manager = await get_room(game_id, uuid)
     current_game = game_manager.get_current_game()
     
     if not current_game:
@@ -74,30 +204,50 @@ async def get_game_info():
         "participants_count": len(current_game.participants),
         "start_time": current_game.start_time,
         "initial_price": current_game.initial_price,
-        "current_price": current_game.current_price
+        "current_price": current_game.current_price,
+        "price_ticks": current_game.price_counter,
+        "missed_ticks": current_game.missed_ticks,
+        "filled_order": current_game.filled_order,
+        "cancel_latency_ms": current_game.cancel_latency_ms,
+        "orders": game_manager.order_state_counts(),
+        # Exchange traffic is only made by the leader worker
+        "exchange_requests": rooms.exchange.scheduler.stats() if cluster.is_leader else None
     }
 
 @router.get("/start")
-async def start_game():
+@router.get("/rooms/{game_id}/start")
+async def start_game(game_id: Optional[str] = None):
     """
     Force start game by auto-generating missing participants
+    Without a game_id this starts the oldest room that has not started yet.
     """
+    return await run_on_leader("start", game_id)
+
+@cluster.command("start")
+async def _start_command(game_id: Optional[str]) -> Tuple[int, Dict]:
     try:
+        # Without a game_id this is the filling lobby, not the round watchers follow
+        game_manager = await get_room(game_id) if game_id is not None else await rooms.lobby_room()
         # Ensure async components are initialized
         await game_manager._ensure_async_components()
-        result = await game_manager.force_start_game()
-        return result
-    
+        result = await rooms.force_start(game_manager)
+        result["game_id"] = game_manager.current_game.game_id
+        return 200, result
+
+    except HTTPException as e:
+        return e.status_code, {"detail": e.detail}
+
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="Internal server error")
+        return 400, {"detail": str(e)}
 
 @router.get("/reset")
 async def reset_game():
     """
-    Reset game state (for testing)
+    Reset game state (for testing) - drops every room
     """
-    game_manager.reset_game()
-    return {"message": "Game reset successfully"}
+    return await run_on_leader("reset")
+
+@cluster.command("reset")
+async def _reset_command() -> Tuple[int, Dict]:
+    await rooms.reset()
+    return 200, {"message": "Game reset successfully"}
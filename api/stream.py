@@ -0,0 +1,93 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from typing import Optional
+
+from api.endpoints import get_room, wants_msgpack
+
+router = APIRouter()
+
+SSE_KEEPALIVE_SECONDS = 15
+
+
+async def _close_on_disconnect(websocket: WebSocket, subscription):
+    """End the subscription once the client goes away, the stream itself never reads"""
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        subscription.close()
+
+
+@router.websocket("/stream")
+@router.websocket("/rooms/{game_id}/stream")
+async def stream_websocket(
+    websocket: WebSocket, format: str = "json", game_id: Optional[str] = None, uuid: Optional[str] = None
+):
+    """
+    Push price ticks, status transitions and the winner over a WebSocket
+    The first message is the current status snapshot. Pass `?format=msgpack`
+    (or `Accept: application/msgpack`) to receive binary msgpack frames.
+    Without a game_id this follows the room of the participant given by `?uuid=`, else
+    the newest room that has started or has players.
+    """
+    try:
+        game_manager = await get_room(game_id, uuid)
+    except HTTPException:
+        await websocket.close(code=4404)
+        return
+    binary = format == "msgpack" or wants_msgpack(websocket.headers.get("accept"))
+    await websocket.accept()
+    subscription = game_manager.events.subscribe()
+    disconnect_watcher = asyncio.create_task(_close_on_disconnect(websocket, subscription))
+    try:
+        if binary:
+            await websocket.send_bytes(game_manager.get_status_event().msgpack)
+            async for event in subscription:
+                await websocket.send_bytes(event.msgpack)
+        else:
+            await websocket.send_text(game_manager.get_status_event().json)
+            async for event in subscription:
+                await websocket.send_text(event.json)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnect_watcher.cancel()
+        game_manager.events.unsubscribe(subscription)
+        subscription.close()
+
+
+async def _sse_events(game_manager):
+    """Yield the current snapshot, then every published event as SSE frames"""
+    subscription = game_manager.events.subscribe()
+    try:
+        yield game_manager.get_status_event().sse
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if event is None:
+                break
+            yield event.sse
+    finally:
+        game_manager.events.unsubscribe(subscription)
+        subscription.close()
+
+
+@router.get("/stream/sse")
+@router.get("/rooms/{game_id}/stream/sse")
+async def stream_sse(game_id: Optional[str] = None, uuid: Optional[str] = None):
+    """
+    Server-Sent Events fallback for clients that cannot open a WebSocket
+    SSE is a text protocol, so this stream is always JSON
+    """
+    game_manager = await get_room(game_id, uuid)
+    return StreamingResponse(
+        _sse_events(game_manager),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
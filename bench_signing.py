@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark inline vs pooled signing for a 20-order batch
+Signs the batch as 20 single-order actions and as one bulk action in each
+signing mode, and measures how long the event loop is blocked meanwhile.
+"""
+import asyncio
+import statistics
+import time
+
+from async_hyper.utils.signing import encode_order, orders_to_action
+from async_hyper.utils.types import LimitOrder
+from eth_account import Account
+
+from services.order_signer import SIGNING_MODES, OrderSigner
+
+ROUNDS = 5
+ORDERS = 20
+
+
+def build_actions(bulk: bool):
+    """20 BTC ALO orders around 60000, as one bulk action or one action each"""
+    orders = []
+    for i in range(ORDERS):
+        is_buy = i < ORDERS // 2
+        px = 60000 - (i % 10 + 1) if is_buy else 60000 + (i % 10 + 1)
+        orders.append(encode_order({
+            "asset": 0,
+            "is_buy": is_buy,
+            "sz": round(10.3 / px, 5),
+            "px": float(px),
+            "ro": False,
+            "order_type": LimitOrder.ALO.value,
+            "cloid": None,
+        }))
+    if bulk:
+        return [orders_to_action(orders)]
+    return [orders_to_action([order]) for order in orders]
+
+
+async def measure(signer: OrderSigner, actions) -> tuple:
+    """(wall time, longest event loop stall) in ms for signing `actions` once"""
+    loop = asyncio.get_running_loop()
+    stalls = []
+    done = False
+
+    async def ticker():
+        # Anything over the 1ms sleep is time the loop could not run other work
+        while not done:
+            before = loop.time()
+            await asyncio.sleep(0.001)
+            stalls.append(loop.time() - before - 0.001)
+
+    probe = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    nonce = int(time.time() * 1000)
+    await signer.sign_all([(action, nonce + i) for i, action in enumerate(actions)])
+    elapsed = time.perf_counter() - start
+    done = True
+    await probe
+    return elapsed * 1000, max(stalls) * 1000
+
+
+async def main():
+    account = Account.create()
+    print(f"🧪 Signing benchmark: {ORDERS} orders, {ROUNDS} rounds per case")
+    print("=" * 64)
+    print(f"{'mode':<10}{'batch':<10}{'signatures':>12}{'wall ms':>14}{'max stall ms':>16}")
+
+    for mode in SIGNING_MODES:
+        signer = OrderSigner(account, is_mainnet=False, mode=mode, workers=2)
+        signer.start()
+        await measure(signer, build_actions(True))  # Warm-up: imports, pool start, caches
+        for bulk in (False, True):
+            actions = build_actions(bulk)
+            results = [await measure(signer, actions) for _ in range(ROUNDS)]
+            wall = statistics.median(r[0] for r in results)
+            stall = statistics.median(r[1] for r in results)
+            label = "bulk" if bulk else "single"
+            print(f"{mode:<10}{label:<10}{len(actions):>12}{wall:>14.1f}{stall:>16.1f}")
+        signer.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
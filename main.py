@@ -1,11 +1,29 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.endpoints import router as api_router
+from api.endpoints import cluster, router as api_router
+from api.stream import router as stream_router
+from utils.diagnostics import configure_logging
+
+# The environment (.env) is loaded by the imports above
+configure_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Join the worker cluster before serving: the leader warms up the exchange client,
+    price feed and fill stream, followers start mirroring its rooms
+    """
+    await cluster.start()
+    yield
+    await cluster.stop()
 
 app = FastAPI(
     title="Oh My Balls API",
     description="A BTC price prediction game for hackathon demonstration",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware for web clients
@@ -19,6 +37,7 @@ app.add_middleware(
 
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
+app.include_router(stream_router, prefix="/api/v1")
 
 @app.get("/")
 async def root():
@@ -29,6 +48,13 @@ async def root():
         "endpoints": {
             "join": "POST /api/v1/join",
             "status": "GET /api/v1/status",
+            "rooms": "GET /api/v1/rooms",
+            "room_join": "POST /api/v1/rooms/{game_id}/join",
+            "queue": "GET /api/v1/queue/{uuid}",
+            "room_status": "GET /api/v1/rooms/{game_id}/status",
+            "room_start": "GET /api/v1/rooms/{game_id}/start",
+            "stream": "WS /api/v1/stream",
+            "stream_sse": "GET /api/v1/stream/sse",
             "game_info": "GET /api/v1/game/info",
             "start": "GET /api/v1/start",
             "game_reset": "GET /api/v1/reset"
@@ -1,7 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict
 from datetime import datetime
 from .ball import BallAssignment
+from .order import OrderRegistry
+from .price_history import PriceHistory
 
 class GameStatus(int):
     PREPARING = 0
@@ -21,9 +23,13 @@ class GameState(BaseModel):
     winner: Optional[str] = None  # Winning ball name
     placed_orders: List[str] = []  # List of order IDs placed via async-hyperliquid
     filled_order: Optional[str] = None  # Order ID of the first filled order
+    orders: OrderRegistry = Field(default_factory=OrderRegistry)  # Order lifecycle states, indexed by oid
+    cancel_latency_ms: Optional[float] = None  # First fill received -> bulk cancel of the other orders acknowledged
     hyperliquid_ws_connected: bool = False
-    price_history: List[Dict[str, float]] = []  # List of {timestamp: timestamp, price: price} objects
-    price_counter: int = 0  # Sequential counter for unique timestamps
+    price_history: PriceHistory = Field(default_factory=PriceHistory)  # Columnar ring buffer of (timestamp, price) ticks
+    price_counter: int = 0  # Number of price ticks recorded
+    missed_ticks: int = 0  # Price ticks skipped because a sample overran its slot
 
     class Config:
         use_enum_values = True
+        arbitrary_types_allowed = True
@@ -0,0 +1,127 @@
+from enum import Enum
+from typing import Dict, List, Optional
+
+from .ball import BallAssignment
+
+
+class OrderState(str, Enum):
+    PENDING = "pending"  # Signed or sent, no exchange status yet
+    RESTING = "resting"
+    PARTIALLY_FILLED = "partially_filled"
+    FILLED = "filled"
+    CANCELLED = "cancelled"
+    REJECTED = "rejected"  # e.g. an ALO order that would have crossed
+
+
+# States an order never leaves
+TERMINAL_STATES = {OrderState.FILLED, OrderState.CANCELLED, OrderState.REJECTED}
+
+# Progress order of the live states, so a late REST status cannot undo a fill seen on the WebSocket
+_STATE_RANK = {OrderState.PENDING: 0, OrderState.RESTING: 1, OrderState.PARTIALLY_FILLED: 2}
+
+
+class TrackedOrder:
+    """One ball's order and its lifecycle on the exchange"""
+
+    def __init__(self, ball: BallAssignment, sz: float):
+        self.ball = ball
+        self.sz = sz
+        self.oid: Optional[str] = None
+        self.state = OrderState.PENDING
+        self.filled_sz = 0.0
+        self.error: Optional[str] = None
+
+    def transition(self, state: OrderState) -> bool:
+        """Move to `state` unless the order is already terminal or further along"""
+        if self.state in TERMINAL_STATES:
+            return False
+        if state not in TERMINAL_STATES and _STATE_RANK[state] < _STATE_RANK[self.state]:
+            return False
+        self.state = state
+        return True
+
+
+class OrderRegistry:
+    """
+    Per-round index of the ball orders, by oid and by ball name
+    Order states are fed from REST order/cancel responses and from fill events,
+    so winner lookup, cancellation and reporting all read one structure.
+    """
+
+    def __init__(self):
+        self._by_oid: Dict[str, TrackedOrder] = {}
+        self._by_ball: Dict[str, TrackedOrder] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_ball)
+
+    def register(self, ball: BallAssignment, sz: float) -> TrackedOrder:
+        """Track a new order for a ball, replacing any earlier one"""
+        previous = self._by_ball.get(ball.ball_name)
+        if previous is not None and previous.oid is not None:
+            self._by_oid.pop(previous.oid, None)
+        order = self._by_ball[ball.ball_name] = TrackedOrder(ball, sz)
+        return order
+
+    def get(self, oid: str) -> Optional[TrackedOrder]:
+        return self._by_oid.get(oid)
+
+    def for_ball(self, ball_name: str) -> Optional[TrackedOrder]:
+        return self._by_ball.get(ball_name)
+
+    def record_status(self, ball_name: str, status: Dict) -> Optional[TrackedOrder]:
+        """Apply one entry of an order response's statuses list"""
+        order = self._by_ball.get(ball_name)
+        if order is None:
+            return None
+
+        placed = status.get("resting") or status.get("filled")
+        if placed is None:
+            order.error = str(status.get("error", status))
+            order.transition(OrderState.REJECTED)
+            return order
+
+        order.oid = str(placed["oid"])
+        self._by_oid[order.oid] = order
+        if "filled" in status:
+            order.filled_sz = max(order.filled_sz, float(placed.get("totalSz", order.sz)))
+            order.transition(OrderState.FILLED if order.filled_sz >= order.sz else OrderState.PARTIALLY_FILLED)
+        else:
+            order.transition(OrderState.RESTING)
+        return order
+
+    def record_rejection(self, ball_name: str, error: str):
+        """Mark a ball's order as rejected when it could not be placed at all"""
+        order = self._by_ball.get(ball_name)
+        if order is not None:
+            order.error = error
+            order.transition(OrderState.REJECTED)
+
+    def apply_fill(self, oid: str, sz: float) -> Optional[TrackedOrder]:
+        """Apply a fill of sz on order oid; returns the order, None if it is not ours"""
+        order = self._by_oid.get(oid)
+        if order is None:
+            return None
+        order.filled_sz += sz
+        order.transition(OrderState.FILLED if order.filled_sz >= order.sz else OrderState.PARTIALLY_FILLED)
+        return order
+
+    def record_cancels(self, oids: List[str], statuses: List):
+        """Apply a cancel response's statuses list ("success" or an error per oid)"""
+        for oid, status in zip(oids, statuses):
+            order = self._by_oid.get(oid)
+            if order is not None and status == "success":
+                order.transition(OrderState.CANCELLED)
+
+    def open_order_ids(self, exclude: Optional[str] = None) -> List[str]:
+        """Order IDs still live on the book"""
+        return [
+            oid for oid, order in self._by_oid.items()
+            if oid != exclude and order.state in (OrderState.RESTING, OrderState.PARTIALLY_FILLED)
+        ]
+
+    def state_counts(self) -> Dict[str, int]:
+        counts = {state.value: 0 for state in OrderState}
+        for order in self._by_ball.values():
+            counts[order.state.value] += 1
+        return counts
@@ -0,0 +1,112 @@
+import sys
+from array import array
+from typing import Dict, List, Optional, Tuple, Union
+
+BytesLike = Union[bytes, memoryview]
+
+
+class PriceHistory:
+    """
+    Columnar ring buffer of price ticks
+    Timestamps and prices live in two parallel array('d') buffers of fixed capacity.
+    Once full, the oldest tick is overwritten. Every tick gets a sequence number
+    (its cursor) that keeps increasing across evictions.
+    """
+
+    def __init__(self, capacity: int = 3600):
+        if capacity <= 0:
+            raise ValueError("Price history capacity must be positive")
+        self.capacity = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._prices = array("d", bytes(8 * capacity))
+        self._total = 0  # Ticks ever appended, i.e. the cursor of the next tick
+        self._base = 0  # Cursor the buffer was last cleared at
+
+    def __len__(self) -> int:
+        return min(self._total - self._base, self.capacity)
+
+    @property
+    def cursor(self) -> int:
+        """Sequence number of the next tick (number of ticks appended so far)"""
+        return self._total
+
+    @property
+    def first_cursor(self) -> int:
+        """Sequence number of the oldest tick still held"""
+        return self._total - len(self)
+
+    def append(self, timestamp: float, price: float):
+        """Store a tick, evicting the oldest one when the buffer is full"""
+        index = self._total % self.capacity
+        self._timestamps[index] = timestamp
+        self._prices[index] = price
+        self._total += 1
+
+    def clear(self, cursor: int = 0):
+        """Drop all ticks and restart the cursor (at `cursor`, for a replica joining mid-game)"""
+        self._total = cursor
+        self._base = cursor
+
+    def last_price(self) -> Optional[float]:
+        """Most recent price, None if empty"""
+        if not len(self):
+            return None
+        return self._prices[(self._total - 1) % self.capacity]
+
+    def time_bounds(self) -> Optional[Tuple[float, float]]:
+        """(oldest, newest) timestamps held, None if empty"""
+        if not len(self):
+            return None
+        first = self._timestamps[self.first_cursor % self.capacity]
+        last = self._timestamps[(self._total - 1) % self.capacity]
+        return first, last
+
+    def segments(self, since: int = 0) -> List[Tuple[memoryview, memoryview]]:
+        """
+        Zero-copy (timestamps, prices) views of ticks with cursor >= since, oldest first
+        A wrapped buffer yields two segments, otherwise there is at most one.
+        """
+        start = max(since, self.first_cursor)
+        count = self._total - start
+        if count <= 0:
+            return []
+
+        timestamps = memoryview(self._timestamps)
+        prices = memoryview(self._prices)
+        begin = start % self.capacity
+        end = begin + count
+        if end <= self.capacity:
+            return [(timestamps[begin:end], prices[begin:end])]
+        end -= self.capacity
+        return [
+            (timestamps[begin:], prices[begin:]),
+            (timestamps[:end], prices[:end]),
+        ]
+
+    def to_list(self, since: int = 0) -> List[Dict[str, float]]:
+        """Ticks with cursor >= since as [{timestamp, price}] for JSON responses"""
+        return [
+            {"timestamp": timestamp, "price": price}
+            for timestamps, prices in self.segments(since)
+            for timestamp, price in zip(timestamps, prices)
+        ]
+
+    def packed_columns(self, since: int = 0) -> Tuple[BytesLike, BytesLike]:
+        """
+        Ticks with cursor >= since as (timestamps, prices) little-endian float64 buffers
+        An unwrapped range on a little-endian host is returned as zero-copy views.
+        """
+        segments = self.segments(since)
+        if len(segments) == 1 and sys.byteorder == "little":
+            return segments[0]
+
+        timestamps = array("d")
+        prices = array("d")
+        for timestamp_segment, price_segment in segments:
+            # frombytes() only takes byte-format buffers, not the 'd' views segments() yields
+            timestamps.frombytes(timestamp_segment.cast("B"))
+            prices.frombytes(price_segment.cast("B"))
+        if sys.byteorder != "little":
+            timestamps.byteswap()
+            prices.byteswap()
+        return timestamps.tobytes(), prices.tobytes()
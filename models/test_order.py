@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("pydantic")
+
+from models.ball import BallAssignment, BallType  # noqa: E402
+from models.order import OrderRegistry, OrderState  # noqa: E402
+
+
+def ball(name: str) -> BallAssignment:
+    return BallAssignment(ball_name=name, target_price=60000.0, uuid="", position=BallType.LONG)
+
+
+def test_statuses_index_orders_by_oid():
+    registry = OrderRegistry()
+    registry.register(ball("B0"), 0.001)
+    registry.register(ball("B1"), 0.001)
+    registry.register(ball("S0"), 0.001)
+
+    registry.record_status("B0", {"resting": {"oid": 11}})
+    registry.record_status("B1", {"filled": {"oid": 12, "totalSz": "0.001"}})
+    registry.record_status("S0", {"error": "Post only order would have immediately matched"})
+
+    assert registry.get("11").state == OrderState.RESTING
+    assert registry.get("12").state == OrderState.FILLED
+    assert registry.for_ball("S0").state == OrderState.REJECTED
+    assert registry.for_ball("S0").error.startswith("Post only")
+    assert registry.open_order_ids() == ["11"]
+
+
+def test_fills_accumulate_until_the_order_is_filled():
+    registry = OrderRegistry()
+    registry.register(ball("B0"), 0.002)
+    registry.record_status("B0", {"resting": {"oid": 7}})
+
+    assert registry.apply_fill("7", 0.001).state == OrderState.PARTIALLY_FILLED
+    assert registry.open_order_ids() == ["7"]
+    assert registry.apply_fill("7", 0.001).state == OrderState.FILLED
+    assert registry.open_order_ids() == []
+    assert registry.apply_fill("99", 0.001) is None
+
+
+def test_late_status_does_not_undo_a_fill():
+    registry = OrderRegistry()
+    registry.register(ball("B0"), 0.001)
+    registry.record_status("B0", {"resting": {"oid": 7}})
+    registry.apply_fill("7", 0.001)
+
+    registry.record_status("B0", {"resting": {"oid": 7}})
+    registry.record_cancels(["7"], ["success"])
+    assert registry.get("7").state == OrderState.FILLED
+
+
+def test_cancels_and_open_orders():
+    registry = OrderRegistry()
+    for name, oid in (("B0", 1), ("B1", 2), ("B2", 3)):
+        registry.register(ball(name), 0.001)
+        registry.record_status(name, {"resting": {"oid": oid}})
+
+    assert registry.open_order_ids(exclude="1") == ["2", "3"]
+    registry.record_cancels(["2", "3"], ["success", {"error": "Order was never placed"}])
+    assert registry.get("2").state == OrderState.CANCELLED
+    assert registry.open_order_ids() == ["1", "3"]
+
+    counts = registry.state_counts()
+    assert counts["resting"] == 2
+    assert counts["cancelled"] == 1
+    assert sum(counts.values()) == len(registry) == 3
+
+
+def test_registering_again_replaces_the_order():
+    registry = OrderRegistry()
+    registry.register(ball("B0"), 0.001)
+    registry.record_status("B0", {"resting": {"oid": 1}})
+    registry.register(ball("B0"), 0.001)
+
+    assert registry.get("1") is None
+    assert registry.for_ball("B0").state == OrderState.PENDING
@@ -0,0 +1,71 @@
+import struct
+
+import pytest
+
+from models.price_history import PriceHistory
+
+
+def unpack(column) -> list:
+    data = bytes(column)
+    return list(struct.unpack(f"<{len(data) // 8}d", data))
+
+
+def test_packed_columns_of_a_wrapped_buffer():
+    history = PriceHistory(4)
+    for i in range(6):
+        history.append(1000.0 + i, 50000.0 + i)
+
+    assert len(history.segments()) == 2
+    timestamps, prices = history.packed_columns()
+    assert unpack(timestamps) == [1002.0, 1003.0, 1004.0, 1005.0]
+    assert unpack(prices) == [50002.0, 50003.0, 50004.0, 50005.0]
+
+
+def test_packed_columns_since_a_cursor():
+    history = PriceHistory(4)
+    for i in range(6):
+        history.append(1000.0 + i, 50000.0 + i)
+
+    timestamps, prices = history.packed_columns(since=4)
+    assert unpack(timestamps) == [1004.0, 1005.0]
+    assert unpack(prices) == [50004.0, 50005.0]
+    assert history.packed_columns(since=6) == (b"", b"")
+
+
+def test_cursor_keeps_counting_across_evictions():
+    history = PriceHistory(3)
+    for i in range(5):
+        history.append(float(i), 100.0 + i)
+
+    assert len(history) == 3
+    assert history.cursor == 5
+    assert history.first_cursor == 2
+    assert history.last_price() == 104.0
+    assert history.time_bounds() == (2.0, 4.0)
+    assert history.to_list(since=0) == [
+        {"timestamp": 2.0, "price": 102.0},
+        {"timestamp": 3.0, "price": 103.0},
+        {"timestamp": 4.0, "price": 104.0},
+    ]
+    assert history.to_list(since=4) == [{"timestamp": 4.0, "price": 104.0}]
+
+
+def test_clear_restarts_at_a_cursor():
+    history = PriceHistory(3)
+    history.append(1.0, 100.0)
+    history.clear(10)
+
+    assert len(history) == 0
+    assert history.last_price() is None
+    assert history.time_bounds() is None
+    assert history.segments() == []
+
+    history.append(2.0, 200.0)
+    assert history.first_cursor == 10
+    assert history.cursor == 11
+    assert history.to_list() == [{"timestamp": 2.0, "price": 200.0}]
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        PriceHistory(0)
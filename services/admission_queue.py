@@ -0,0 +1,75 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+
+class AdmissionTicket:
+    """A player waiting for a seat; `assigned` is set once they are seated"""
+
+    __slots__ = ("uuid", "seq", "last_seen", "assigned")
+
+    def __init__(self, participant_uuid: str, seq: int):
+        self.uuid = participant_uuid
+        self.seq = seq
+        self.last_seen = time.monotonic()
+        self.assigned = asyncio.Event()
+
+    def touch(self):
+        self.last_seen = time.monotonic()
+
+
+class AdmissionQueue:
+    """
+    FIFO of players waiting for the next round to open
+    Tickets carry a sequence number, so a position is O(1) to compute. Tickets
+    that nobody has polled for ticket_ttl seconds are dropped on admission
+    instead of being seated as ghost players.
+    """
+
+    def __init__(self, max_size: int = 10000, ticket_ttl: float = 60.0):
+        self.max_size = max_size
+        self.ticket_ttl = ticket_ttl
+        self._tickets: "OrderedDict[str, AdmissionTicket]" = OrderedDict()
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return len(self._tickets)
+
+    def get(self, participant_uuid: str) -> Optional[AdmissionTicket]:
+        return self._tickets.get(participant_uuid)
+
+    def enqueue(self, participant_uuid: str) -> AdmissionTicket:
+        """Queue a player, or return their existing ticket"""
+        ticket = self._tickets.get(participant_uuid)
+        if ticket is not None:
+            ticket.touch()
+            return ticket
+        if len(self._tickets) >= self.max_size:
+            raise ValueError("All rooms are full")
+        ticket = AdmissionTicket(participant_uuid, self._next_seq)
+        self._next_seq += 1
+        self._tickets[participant_uuid] = ticket
+        return ticket
+
+    def position(self, ticket: AdmissionTicket) -> int:
+        """1-based place in line (an upper bound while expired tickets are still queued)"""
+        head = next(iter(self._tickets.values()))
+        return ticket.seq - head.seq + 1
+
+    def take(self, count: int) -> List[AdmissionTicket]:
+        """Pop up to count live tickets from the front, dropping expired ones"""
+        batch = []
+        now = time.monotonic()
+        while self._tickets and len(batch) < count:
+            _, ticket = self._tickets.popitem(last=False)
+            if now - ticket.last_seen > self.ticket_ttl:
+                ticket.assigned.set()  # Wake a stale waiter; it finds no seat and no ticket
+                continue
+            batch.append(ticket)
+        return batch
+
+    def clear(self):
+        for ticket in self._tickets.values():
+            ticket.assigned.set()
+        self._tickets.clear()
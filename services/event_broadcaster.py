@@ -0,0 +1,142 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional, Set
+
+import msgpack
+
+from utils.diagnostics import get_logger
+
+log = get_logger(__name__)
+
+
+class GameEvent:
+    """A game event encoded once and shared by every subscriber"""
+
+    def __init__(
+        self,
+        event_type: str,
+        data: Optional[Dict[str, Any]] = None,
+        encoded_data: Optional[bytes] = None,
+        packed_data: Optional[bytes] = None,
+    ):
+        self.type = event_type
+        self.data = data
+        self._encoded_data = encoded_data  # Pre-encoded JSON for `data`
+        self._packed_data = packed_data  # Pre-encoded msgpack for `data`
+        self._json: Optional[str] = None
+        self._sse: Optional[bytes] = None
+        self._msgpack: Optional[bytes] = None
+
+    @property
+    def json(self) -> str:
+        """Event as a JSON text frame: {"type": ..., "data": ...}"""
+        if self._json is None:
+            if self._encoded_data is not None:
+                data = self._encoded_data.decode()
+            else:
+                data = json.dumps(self.data, separators=(",", ":"))
+            self._json = f'{{"type":"{self.type}","data":{data}}}'
+        return self._json
+
+    @property
+    def sse(self) -> bytes:
+        """Event framed for a text/event-stream response"""
+        if self._sse is None:
+            self._sse = f"event: {self.type}\ndata: {self.json}\n\n".encode()
+        return self._sse
+
+    @property
+    def msgpack(self) -> bytes:
+        """Event as a msgpack binary frame: {"type": ..., "data": ...}"""
+        if self._msgpack is None:
+            if self._packed_data is None:
+                self._msgpack = msgpack.packb({"type": self.type, "data": self.data})
+            else:
+                # Splice the pre-encoded body into a two-entry map
+                self._msgpack = b"".join([
+                    b"\x82",
+                    msgpack.packb("type"),
+                    msgpack.packb(self.type),
+                    msgpack.packb("data"),
+                    self._packed_data,
+                ])
+        return self._msgpack
+
+
+class Subscription:
+    """A subscriber's bounded event queue"""
+
+    def __init__(self, max_queue: int):
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.closed = False
+
+    @property
+    def depth(self) -> int:
+        """Events queued and not yet read"""
+        return self._queue.qsize()
+
+    def offer(self, event: GameEvent) -> bool:
+        """Queue an event without blocking; returns False if the subscriber fell behind"""
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.close()
+            return False
+
+    def close(self):
+        """Drop any backlog and wake the reader with the end-of-stream marker"""
+        self.closed = True
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def get(self) -> Optional[GameEvent]:
+        """Wait for the next event, None once the subscription is closed"""
+        return await self._queue.get()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> GameEvent:
+        event = await self.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+
+class EventBroadcaster:
+    """
+    Fans out game events to all stream subscribers
+    Publishing never awaits: a subscriber whose queue is full is dropped
+    and has to reconnect, which gives it a fresh status snapshot.
+    """
+
+    def __init__(self, max_queue: int = 64):
+        self.max_queue = max_queue
+        self._subscribers: Set[Subscription] = set()
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.max_queue)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def publish(self, event: GameEvent):
+        """Deliver the same event object to every subscriber"""
+        for subscription in list(self._subscribers):
+            depth = subscription.depth  # Read first: a dropped subscription's backlog is discarded
+            if not subscription.offer(event):
+                log.warning(
+                    "⚠️ [STREAM] Dropping slow subscriber with %d events queued", depth,
+                    extra={"sample_key": "slow_subscriber"},
+                )
+                self._subscribers.discard(subscription)
@@ -0,0 +1,144 @@
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+import aiohttp
+from async_hyper import AsyncHyper
+
+from services.order_executor import OrderExecutor
+from services.order_signer import OrderSigner
+from services.price_feed import MAINNET_WS_URL, TESTNET_WS_URL, StreamingPriceFeed
+from services.price_service import PriceService
+from services.request_scheduler import INFO_WEIGHT, RequestLane, RequestScheduler
+from websocket.hyperliquid_client import HyperliquidWebSocketClient
+
+
+class ExchangeContext:
+    """
+    Long-lived exchange clients: one pooled keep-alive HTTP session, the AsyncHyper
+    client on top of it, the price feed and the fill subscription
+    Started once at app startup (or lazily by the first caller) and closed on shutdown.
+    """
+
+    def __init__(self):
+        self.address = os.getenv("HL_ADDR", "")
+        self.pk = os.getenv("HL_PK", "")
+        self.is_mainnet = os.getenv("IS_MAINNET", "true").lower() == "true"
+        # "stream" keeps the price from the exchange WebSocket (REST fallback when stale), "rest" polls only
+        self.price_feed_mode = os.getenv("PRICE_FEED_MODE", "stream").lower()
+        self.price_ws_url = os.getenv("PRICE_WS_URL") or (MAINNET_WS_URL if self.is_mainnet else TESTNET_WS_URL)
+        # Seconds without a stream update after which prices are fetched over REST again
+        self.price_stream_stale_after = float(os.getenv("PRICE_STREAM_STALE_AFTER", "3.0"))
+        self.fills_ws_url = os.getenv("FILLS_WS_URL") or (MAINNET_WS_URL if self.is_mainnet else TESTNET_WS_URL)
+        # Max age (seconds) of a cached price for general reads, and for pricing orders at execution
+        self.price_max_age = float(os.getenv("PRICE_MAX_AGE", "1.0"))
+        self.order_price_max_age = float(os.getenv("ORDER_PRICE_MAX_AGE", "2.0"))
+        # Orders per signed bulk order request
+        self.order_bulk_chunk_size = int(os.getenv("ORDER_BULK_CHUNK_SIZE", "20"))
+        # HTTP pool: total and per-host connection caps, DNS cache TTL, idle keep-alive,
+        # and how many connections to open ahead of the first request
+        self.http_pool_limit = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+        self.http_pool_limit_per_host = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "32"))
+        self.http_dns_ttl = int(os.getenv("HTTP_DNS_TTL", "300"))
+        self.http_keepalive_timeout = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "60"))
+        self.http_prewarm_connections = int(os.getenv("HTTP_PREWARM_CONNECTIONS", "4"))
+        # Exchange request weight budget per minute (the exchange allows 1200 per IP)
+        self.weight_per_minute = int(os.getenv("EXCHANGE_WEIGHT_PER_MINUTE", "1200"))
+        # Where order and cancel actions are signed: "inline" (event loop), "thread" or "process" pool
+        self.signing_mode = os.getenv("SIGNING_MODE", "thread").lower()
+        self.signing_workers = int(os.getenv("SIGNING_WORKERS", "2"))
+
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.async_hyper: Optional[AsyncHyper] = None
+        self.price_feed: Optional[StreamingPriceFeed] = None
+        self.price_service: Optional[PriceService] = None
+        self.order_executor: Optional[OrderExecutor] = None
+        self.fill_client: Optional[HyperliquidWebSocketClient] = None
+        self.signer: Optional[OrderSigner] = None
+        self.scheduler = RequestScheduler(self.weight_per_minute)
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self.async_hyper is not None
+
+    async def start(self):
+        """Build the clients, open the streams and warm the connection pool (idempotent)"""
+        async with self._start_lock:
+            if self.started:
+                return
+
+            connector = aiohttp.TCPConnector(
+                limit=self.http_pool_limit,
+                limit_per_host=self.http_pool_limit_per_host,
+                ttl_dns_cache=self.http_dns_ttl,
+                keepalive_timeout=self.http_keepalive_timeout,
+                enable_cleanup_closed=True,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(connect=3, sock_connect=3, sock_read=10),
+            )
+            self.async_hyper = AsyncHyper(self.address, self.pk, self.is_mainnet, session=self.session)
+
+            if self.price_feed_mode == "stream":
+                self.price_feed = StreamingPriceFeed(self.price_ws_url, stale_after=self.price_stream_stale_after)
+                self.price_feed.start()
+            self.price_service = PriceService(
+                self.async_hyper, self.price_feed, self.price_max_age, self.scheduler
+            )
+            self.signer = OrderSigner(
+                self.async_hyper.account, self.is_mainnet, self.signing_mode, self.signing_workers
+            )
+            self.signer.start()
+            self.order_executor = OrderExecutor(
+                self.async_hyper,
+                self.price_service,
+                self.order_price_max_age,
+                self.order_bulk_chunk_size,
+                self.scheduler,
+                self.signer,
+                self.post_info,
+                self.address,
+            )
+            if self.address:
+                self.fill_client = HyperliquidWebSocketClient(self.fills_ws_url, self.address)
+                self.fill_client.start()
+
+            await self._warm_up()
+
+    async def _warm_up(self):
+        """Load exchange metadata and open pooled connections ahead of the first round"""
+        opens = [self._open_connection() for _ in range(max(0, self.http_prewarm_connections - 1))]
+        results = await asyncio.gather(self.order_executor.warm_up(), *opens, return_exceptions=True)
+        opened = sum(1 for result in results[1:] if result is True)
+        print(f"✅ [NETWORK] Exchange context ready, {opened} extra pooled connections opened")
+
+    async def _open_connection(self) -> bool:
+        """Make one cheap info request so a TLS connection is left idle in the pool"""
+        try:
+            await self.scheduler.submit(RequestLane.PRICE, INFO_WEIGHT, lambda: self.post_info({"type": "allMids"}))
+            return True
+        except Exception as e:
+            print(f"⚠️ [NETWORK] Connection pre-warm failed: {type(e).__name__}: {e}")
+            return False
+
+    async def post_info(self, payload: Dict) -> Any:
+        """Send an info request on the pooled session and return its JSON reply"""
+        async with self.session.post(f"{self.async_hyper.base_url}/info", json=payload) as resp:
+            resp.raise_for_status()
+            return await resp.json()
+
+    async def close(self):
+        """Stop the streams and close the HTTP session"""
+        if self.fill_client:
+            await self.fill_client.stop()
+        if self.price_feed:
+            await self.price_feed.stop()
+        await self.scheduler.close()
+        if self.signer:
+            self.signer.close()
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+        self.async_hyper = None
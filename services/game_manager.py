@@ -1,113 +1,225 @@
 import asyncio
+import json
 import os
 import random
+import time
 import uuid
+from collections import deque
+from contextlib import suppress
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Callable, Deque, Dict, List, Optional, Tuple
 
 import dotenv
-from async_hyper import AsyncHyper
+import msgpack
 
+from models.ball import BallAssignment
 from models.game import GameState, GameStatus
+from models.order import TrackedOrder
+from models.price_history import PriceHistory
 from services.ball_calculator import BallCalculator
-from services.order_executor import OrderExecutor
-from services.price_service import PriceService
+from services.event_broadcaster import EventBroadcaster, GameEvent
+from services.exchange_context import ExchangeContext
+from services.order_executor import PreparedOrderBatch, SignedCancel
+from services.price_downsampler import PriceDownsampler
+from services.tick_scheduler import TickScheduler
+from utils.diagnostics import get_logger
 
 dotenv.load_dotenv()
 
+log = get_logger(__name__)
+
 
 class GameManager:
     """Manages game state and lifecycle"""
 
-    def __init__(self):
+    def __init__(self, exchange: Optional[ExchangeContext] = None):
         self.current_game: Optional[GameState] = None
         self.ball_calculator = BallCalculator()
 
-        # Store configuration for lazy initialization of async components
-        self.address = os.getenv("HL_ADDR", "")
-        self.pk = os.getenv("HL_PK", "")
-        self.is_mainnet = os.getenv("IS_MAINNET", "true").lower() == "true"
+        # Exchange clients are shared and long-lived; built on startup() or on first use
+        self.exchange = exchange or ExchangeContext()
+        self.price_history_capacity = int(os.getenv("PRICE_HISTORY_CAPACITY", "3600"))
+        # Price sampling cadence in seconds, down to the 100ms the design calls for
+        self.price_tick_interval = max(0.1, float(os.getenv("PRICE_TICK_INTERVAL", "1.0")))
+        # Lobby size at which the start price and order context start being kept warm
+        self.prefetch_fill_threshold = int(os.getenv("PREFETCH_FILL_THRESHOLD", "15"))
+        # Pre-signed orders are re-signed only when the price moves more than this (USD)
+        self.order_refresh_tolerance = float(os.getenv("ORDER_REFRESH_TOLERANCE", "1.0"))
+        # How long a round waits for its first fill before falling back to the closest ball
+        self.fill_wait_timeout = float(os.getenv("FILL_WAIT_TIMEOUT", "120"))
+        # Budget for cancelling the losing orders after the first fill (design target: 500ms)
+        self.cancel_latency_budget_ms = float(os.getenv("CANCEL_LATENCY_BUDGET_MS", "500"))
+        # First delay (seconds, doubling up to 10) before retrying a full game whose start failed
+        self.start_retry_interval = float(os.getenv("START_RETRY_INTERVAL", "1.0"))
         
-        # Async components will be initialized when needed
-        self._async_hyper: Optional[AsyncHyper] = None
-        self._price_service: Optional[PriceService] = None
-        self._order_executor: Optional[OrderExecutor] = None
         self._price_update_task: Optional[asyncio.Task] = None
+        self._prefetch_task: Optional[asyncio.Task] = None
+        self._order_prep_task: Optional[asyncio.Task] = None
+        self._prepared_orders: Optional[PreparedOrderBatch] = None
+        self._cancel_task: Optional[asyncio.Task] = None
+        self._start_retry_task: Optional[asyncio.Task] = None
+        self._execution_task: Optional[asyncio.Task] = None
+
+        # Versioned status snapshot: bumped on every state change, encoded lazily once per version
+        self._state_version = 0
+        self._snapshot_epoch = uuid.uuid4().hex[:8]
+        self._status_data: Optional[Dict] = None
+        self._status_snapshot: Optional[bytes] = None
+        self._status_msgpack: Optional[bytes] = None
+        self._downsampled_cache: Dict[Tuple[float, bool], bytes] = {}
+        self._downsampler = PriceDownsampler()
+        self._status_snapshot_version = -1
+        # Set and replaced on every version bump to wake long-poll waiters
+        self._state_changed = asyncio.Event()
+
+        # Push stream fan-out for price ticks, status transitions and the winner
+        self.events = EventBroadcaster()
+
+        # Unassigned balls of the current game, pre-shuffled; joins pop from the left in O(1)
+        self._free_balls: Deque[BallAssignment] = deque()
+        # Game whose DRAWING transition has been claimed, so start_game runs once per game
+        self._starting: Optional[GameState] = None
+        # Last game fields and order-state counts applied from the leader, on read-only workers
+        self._replica_fields: Optional[Dict] = None
+        self._replica_orders: Optional[Dict[str, int]] = None
+        # Called with this manager whenever a round starts drawing / reaches DONE
+        self.on_started: Optional[Callable[["GameManager"], None]] = None
+        self.on_finished: Optional[Callable[["GameManager"], None]] = None
 
     async def _ensure_async_components(self):
         """Ensure async components are initialized"""
-        if self._async_hyper is None:
-            self._async_hyper = AsyncHyper(self.address, self.pk, self.is_mainnet)
-            self._price_service = PriceService(self._async_hyper)
-            self._order_executor = OrderExecutor(self._async_hyper)
+        await self.exchange.start()
 
     @property
     def price_service(self):
         """Get price service, raise error if not initialized"""
-        if self._price_service is None:
+        if self.exchange.price_service is None:
             raise RuntimeError("Price service not initialized. Call _ensure_async_components() first.")
-        return self._price_service
+        return self.exchange.price_service
 
     @property
     def order_executor(self):
         """Get order executor, raise error if not initialized"""
-        if self._order_executor is None:
+        if self.exchange.order_executor is None:
             raise RuntimeError("Order executor not initialized. Call _ensure_async_components() first.")
-        return self._order_executor
+        return self.exchange.order_executor
 
     async def create_new_game(self) -> str:
         """Create a new game instance"""
         game_id = str(uuid.uuid4())
-        self.current_game = GameState(game_id=game_id, status=GameStatus.PREPARING)
+        self.current_game = GameState(
+            game_id=game_id,
+            status=GameStatus.PREPARING,
+            price_history=PriceHistory(self.price_history_capacity),
+        )
+        # Balls come back shuffled, so handing them out in deque order is a random assignment
+        self.current_game.balls = self.ball_calculator.generate_empty_ball_assignments()
+        self._free_balls = deque(self.current_game.balls)
+        self._downsampler = PriceDownsampler()
+        self._mark_state_changed()
         return game_id
 
     async def join_game(self, participant_uuid: str) -> str:
-        """Register a participant and assign a ball"""
+        """
+        Register a participant and assign a ball
+        Everything up to the assignment runs without awaiting, so concurrent joins
+        cannot interleave: no ball is handed out twice and only the join that takes
+        the last ball starts the game.
+        """
         if not self.current_game:
             await self.create_new_game()
+        game = self.current_game
 
-        if self.current_game.status != GameStatus.PREPARING:
+        if game.status != GameStatus.PREPARING:
             raise ValueError("Game is not in preparing state")
 
         # Check if participant already joined - return their existing ball
-        if participant_uuid in self.current_game.participants:
-            return self.current_game.participants[participant_uuid]
+        if participant_uuid in game.participants:
+            return game.participants[participant_uuid]
 
-        if len(self.current_game.participants) >= 20:
+        if not self._free_balls:
             raise ValueError("Game is full")
 
-        # Generate ball assignments without prices if not done yet
-        if not self.current_game.balls:
-            self.current_game.balls = (
-                self.ball_calculator.generate_empty_ball_assignments()
-            )
+        assigned_ball = self._assign_ball(participant_uuid)
+        self._mark_state_changed()
 
-        # Find next available ball
-        available_balls = [ball for ball in self.current_game.balls if not ball.uuid]
-        if not available_balls:
-            raise ValueError("No balls available")
+        # Check if game is ready to start
+        if not self._free_balls:
+            try:
+                await self.start_game()
+            except Exception as e:
+                # The player keeps their seat; the full game starts once a start price can be read
+                print(f"⚠️ [GAME] Could not start the full game, retrying: {type(e).__name__}: {e}")
+                self._schedule_start_retry()
+        elif len(self.current_game.participants) >= self.prefetch_fill_threshold:
+            self._start_prefetch()
 
-        assigned_ball = available_balls[0]
-        assigned_ball.uuid = participant_uuid
+        return assigned_ball.ball_name
 
-        self.current_game.participants[participant_uuid] = assigned_ball.ball_name
+    def _assign_ball(self, participant_uuid: str) -> BallAssignment:
+        """Take the next free ball for a participant"""
+        ball = self._free_balls.popleft()
+        ball.uuid = participant_uuid
+        self.current_game.participants[participant_uuid] = ball.ball_name
+        return ball
 
-        # Check if game is ready to start
-        if len(self.current_game.participants) == 20:
-            await self.start_game()
+    def _start_prefetch(self):
+        """Start keeping the start price and order context warm for the filling lobby"""
+        if self._prefetch_task is None or self._prefetch_task.done():
+            self._prefetch_task = asyncio.create_task(self._prefetch_loop(self.current_game))
 
-        return assigned_ball.ball_name
+    async def _prefetch_loop(self, game: GameState):
+        """
+        Refresh the shared price cache while the lobby fills, so start_game()
+        reads a fresh price from memory and the last join never waits on the network
+        """
+        await self._ensure_async_components()
+        await self.order_executor.warm_up()
+        interval = self.exchange.price_max_age / 2
+        while self.current_game is game and game.status == GameStatus.PREPARING:
+            # Refresh once the price is older than half an interval: it then never gets
+            # older than interval + one round trip, well inside the read max age
+            self.price_service.prefetch(max_age=interval / 2)
+            await asyncio.sleep(interval)
+
+    def _schedule_start_retry(self):
+        if self._start_retry_task is None or self._start_retry_task.done():
+            self._start_retry_task = asyncio.create_task(self._retry_start(self.current_game))
+
+    async def _retry_start(self, game: GameState):
+        """Keep trying to start a full game until it starts or is reset"""
+        delay = self.start_retry_interval
+        while self.current_game is game and game.status == GameStatus.PREPARING:
+            await asyncio.sleep(delay)
+            if self.current_game is not game or self._starting is game:
+                continue  # Reset, or a forced start is already under way
+            try:
+                await self.start_game()
+            except Exception as e:
+                print(f"⚠️ [GAME] Start retry failed: {type(e).__name__}: {e}")
+                delay = min(delay * 2, 10.0)
 
     async def start_game(self):
         """Start the game (transition from preparing to drawing)"""
-        if not self.current_game or self.current_game.status != GameStatus.PREPARING:
+        game = self.current_game
+        if not game or game.status != GameStatus.PREPARING or self._starting is game:
             raise ValueError("Game not ready to start")
+        # Claimed before the first await, so a concurrent caller cannot start it again
+        self._starting = game
 
-        # Ensure async components are initialized
-        await self._ensure_async_components()
+        try:
+            # Ensure async components are initialized
+            await self._ensure_async_components()
+
+            # Get current BTC price and calculate ball prices
+            initial_price = await self.price_service.get_current_price()
+        except Exception:
+            self._starting = None
+            raise
+        if self.current_game is not game:
+            return  # Reset while the start price was being fetched
 
-        # Get current BTC price and calculate ball prices
-        self.current_game.initial_price = await self.price_service.get_current_price()
+        self.current_game.initial_price = initial_price
         self.ball_calculator.calculate_ball_prices(
             self.current_game.balls, self.current_game.initial_price
         )
@@ -116,67 +228,98 @@ class GameManager:
         self.current_game.start_time = datetime.now()
         
         # Initialize price history with the first price point
-        self.current_game.price_history = []
+        self.current_game.price_history.clear()
         self.current_game.price_counter = 0
         
-        # Add first price entry with timestamp = start_time + counter (0)
-        first_timestamp = int(self.current_game.start_time.timestamp())
-        self.current_game.price_history.append({"timestamp": first_timestamp, "price": self.current_game.initial_price})
-        self.current_game.price_counter = 1  # Increment counter for next entry
+        # Add first price entry at the start time
+        first_timestamp = self.current_game.start_time.timestamp()
+        self.current_game.price_history.append(first_timestamp, self.current_game.initial_price)
+        self.current_game.price_counter = 1
+        self._mark_state_changed()
 
         # Start price update loop
         self._price_update_task = asyncio.create_task(self._price_update_loop())
 
         # Schedule order execution after 30 seconds
-        asyncio.create_task(self._schedule_order_execution())
+        self._execution_task = asyncio.create_task(self._schedule_order_execution())
 
-    async def _price_update_loop(self):
-        """Update price every 1s during active game and cache to price_history"""
-        while self.current_game and self.current_game.status == GameStatus.DRAWING:
-            # Check if game is still in DRAWING status before proceeding
-            if not self.current_game or self.current_game.status != GameStatus.DRAWING:
-                print("Game status changed to DONE - stopping price updates")
-                break
-                
-            # Generate unique timestamp using start_time + counter
-            current_timestamp = int(self.current_game.start_time.timestamp()) + self.current_game.price_counter
-            
+        # Build and sign the order batch during the drawing window
+        self._prepared_orders = None
+        self._order_prep_task = asyncio.create_task(self._prepare_orders_loop(self.current_game))
+
+        if self.on_started is not None:
+            self.on_started(self)
+
+    async def _prepare_orders_loop(self, game: GameState):
+        """
+        Keep a pre-signed order batch priced around the latest cached price
+        It is re-signed only when the price moves past the refresh tolerance,
+        so execution at the deadline is pure network dispatch.
+        """
+        while self.current_game is game and game.status == GameStatus.DRAWING:
             try:
-                current_price = await self.price_service.get_current_price()
-                self.current_game.current_price = current_price
-                
-                # Add price to history with unique timestamp
-                self.current_game.price_history.append({"timestamp": current_timestamp, "price": current_price})
-                self.current_game.price_counter += 1
-                
+                price = await self.price_service.get_current_price()
+                batch = self._prepared_orders
+                if batch is None or self.order_executor.needs_refresh(batch, price, self.order_refresh_tolerance):
+                    self._prepared_orders = await self.order_executor.prepare_orders(game.balls, price)
             except Exception as e:
-                print(f"Price update error: {e}")
-                
-                # Use previous price as fallback to avoid skipping timestamps
-                fallback_price = self._get_fallback_price()
-                if fallback_price is not None:
-                    self.current_game.current_price = fallback_price
-                    self.current_game.price_history.append({"timestamp": current_timestamp, "price": fallback_price})
-                    self.current_game.price_counter += 1
-                    print(f"Using fallback price: {fallback_price}")
-                else:
-                    print("No fallback price available - skipping this timestamp")
-            
-            await asyncio.sleep(1)  # 1s
-        
-        print("Price update loop stopped - game completed")
+                print(f"⚠️ [GAME] Order preparation failed: {type(e).__name__}: {e}")
+            await asyncio.sleep(self.price_tick_interval)
+
+    async def _price_update_loop(self):
+        """Sample the price on a drift-free cadence during the active game and cache to price_history"""
+        game = self.current_game
+        scheduler = TickScheduler(self.price_tick_interval, lambda: self._sample_price(game, scheduler))
+        try:
+            await scheduler.run(
+                lambda: self.current_game is game and game.status == GameStatus.DRAWING
+            )
+        finally:
+            game.missed_ticks = scheduler.missed_ticks
+            print(f"Price update loop stopped - {scheduler.ticks} ticks, {scheduler.missed_ticks} missed")
+
+    async def _sample_price(self, game: GameState, scheduler: TickScheduler):
+        """Take one price sample, stamped with the time it was actually observed"""
+        game.missed_ticks = scheduler.missed_ticks
+        try:
+            current_price = await self.price_service.get_current_price()
+            if self.current_game is not game:
+                return  # Game was reset while the price was in flight
+            self._append_price(time.time(), current_price)
+
+        except Exception as e:
+            print(f"Price update error: {e}")
+
+            # Use previous price as fallback to avoid gaps in the chart
+            fallback_price = self._get_fallback_price()
+            if fallback_price is not None:
+                self._append_price(time.time(), fallback_price)
+                print(f"Using fallback price: {fallback_price}")
+            else:
+                print("No fallback price available - skipping this tick")
+
+    def _append_price(self, timestamp: float, price: float):
+        """Record a price tick and push it to stream subscribers"""
+        self.current_game.current_price = price
+        self.current_game.price_history.append(timestamp, price)
+        self.current_game.price_counter += 1
+        self._mark_state_changed(publish_status=False)
+        self.events.publish(GameEvent("price", {
+            "timestamp": timestamp,
+            "price": price,
+            "cursor": self.current_game.price_history.cursor,
+        }))
 
     def _get_fallback_price(self) -> Optional[float]:
         """
         Get the last known price from price history as fallback
         Returns None if no previous price is available
         """
-        if not self.current_game or not self.current_game.price_history:
+        if not self.current_game:
             return None
         
         # Get the last price entry from history
-        last_entry = self.current_game.price_history[-1]
-        return last_entry.get('price', None)
+        return self.current_game.price_history.last_price()
 
     async def _schedule_order_execution(self):
         """Schedule order execution after 30 seconds"""
@@ -190,6 +333,9 @@ class GameManager:
         if not self.current_game:
             return
 
+        game = self.current_game
+        fills: Optional[asyncio.Queue] = None
+        cancels: Optional[asyncio.Task] = None
         try:
             # Ensure async components are initialized
             print(f"🔧 [GAME] Initializing async components...")
@@ -198,86 +344,168 @@ class GameManager:
             
             # Place all orders using async-hyperliquid
             print(f"🚀 [GAME] Starting order placement for {len(self.current_game.balls)} balls...")
+            if self._order_prep_task:
+                self._order_prep_task.cancel()
+                self._order_prep_task = None
+            prepared, self._prepared_orders = self._prepared_orders, None
+            # Listen before placing so a fill that lands during placement is not missed
+            fill_client = self.exchange.fill_client
+            fills = fill_client.listen() if fill_client else None
             placed_orders = await self.order_executor.place_orders(
-                self.current_game.balls
+                self.current_game.balls, prepared, self.order_refresh_tolerance, self.current_game.orders
             )
             print(f"📊 [GAME] Order placement completed. Placed orders: {len(placed_orders)}")
             self.current_game.placed_orders = placed_orders
+            # Order placement rewrites ball target prices
+            self._mark_state_changed()
 
             # Check if any orders were successfully placed
             if not placed_orders:
                 print("No orders were successfully placed - using fallback winner determination")
                 # Use fallback winner determination when no orders were placed
-                self.current_game.winner = self._determine_fallback_winner()
-                self.current_game.status = GameStatus.DONE
-                self.current_game.end_time = datetime.now()
-                self.current_game.final_price = self.current_game.current_price
-                
-                # Stop price updates
-                if self._price_update_task:
-                    self._price_update_task.cancel()
-                    self._price_update_task = None
+                await self._finish_without_fill(game)
             else:
+                # Sign the losing-order cancels while the book is waiting for a fill
+                cancels = asyncio.create_task(self.order_executor.prepare_cancels(game.orders.open_order_ids()))
+                # Used only if ready in time; a failure just means the cancel is signed on the fill
+                cancels.add_done_callback(lambda f: f.cancelled() or f.exception())
                 # Monitor for first fill
                 print(f"👀 [GAME] Starting order monitoring for {len(placed_orders)} placed orders...")
-                winner_ball = await self._monitor_order_fills()
-                print(f"🏆 [GAME] Order monitoring completed. Winner: {winner_ball}")
-
-                if winner_ball:
-                    self.current_game.winner = winner_ball
-                    self.current_game.status = GameStatus.DONE
-                    self.current_game.end_time = datetime.now()
-                    self.current_game.final_price = self.current_game.current_price
-
-                    # Stop price updates
-                    if self._price_update_task:
-                        self._price_update_task.cancel()
-                        self._price_update_task = None
+                filled = await self._monitor_order_fills(fills, cancels)
+
+                if filled:
+                    order, decided_us = filled
+                    # Winner first; logging (level-gated) waits until the cancel is out and the state is updated
+                    self._complete_game(order.ball.ball_name)
+                    log.info(
+                        "🎉 [NETWORK] Order filled: %s (%s), winner decided %.0fµs after socket read",
+                        order.oid, order.state.value, decided_us,
+                    )
+                    log.info("🏆 [GAME] Order monitoring completed. Winner: %s", order.ball.ball_name)
                 else:
                     print("No orders were filled - using fallback winner determination")
                     # Use fallback winner determination when no orders were filled
-                    self.current_game.winner = self._determine_fallback_winner()
-                    self.current_game.status = GameStatus.DONE
-                    self.current_game.end_time = datetime.now()
-                    self.current_game.final_price = self.current_game.current_price
-                    
-                    # Stop price updates
-                    if self._price_update_task:
-                        self._price_update_task.cancel()
-                        self._price_update_task = None
+                    await self._finish_without_fill(game)
 
         except Exception as e:
             print(f"❌ [GAME] Order execution error: {type(e).__name__}: {e}")
             print(f"🔍 [GAME] Error details: {str(e)}")
             # Use fallback winner determination when order execution fails
             print(f"🔄 [GAME] Using fallback winner determination...")
-            self.current_game.winner = self._determine_fallback_winner()
-            self.current_game.status = GameStatus.DONE
-            self.current_game.end_time = datetime.now()
-            self.current_game.final_price = self.current_game.current_price
-            
-            # Stop price updates
-            if self._price_update_task:
-                self._price_update_task.cancel()
-                self._price_update_task = None
-
-    async def _monitor_order_fills(self) -> Optional[str]:
-        """Monitor order fills via Hyperliquid WebSocket"""
-        if not self.current_game.placed_orders:
+            await self._finish_without_fill(game)
+        finally:
+            if fills is not None:
+                fill_client.remove_listener(fills)
+            if cancels is not None and not cancels.done():
+                cancels.cancel()
+
+    async def _finish_without_fill(self, game: GameState):
+        """
+        End a round no fill decided: the closest ball wins, then every order still
+        resting is cancelled so nothing is left on the book after the round is DONE
+        """
+        if self.current_game is game and game.status != GameStatus.DONE:
+            self._complete_game(self._determine_fallback_winner())
+        await self._cancel_open_orders(game)
+
+    async def _cancel_open_orders(self, game: GameState):
+        """Bulk-cancel every order of the round still live on the book (cancel lane)"""
+        open_ids = game.orders.open_order_ids()
+        if not open_ids or self.exchange.order_executor is None:
+            return
+        cancelled = await self.order_executor.cancel_orders(open_ids, game.orders)
+        self._mark_state_changed(publish_status=False)
+        if cancelled:
+            print(f"🧹 [GAME] Cancelled {len(open_ids)} resting orders of {game.game_id}")
+        else:
+            print(f"❌ [GAME] Could not cancel {len(open_ids)} resting orders of {game.game_id}")
+
+    def _complete_game(self, winner: str):
+        """Record the winner, move the game to DONE and stop price updates"""
+        self.current_game.winner = winner
+        self.current_game.status = GameStatus.DONE
+        self.current_game.end_time = datetime.now()
+        self.current_game.final_price = self.current_game.current_price
+        self._mark_state_changed()
+        self.events.publish(GameEvent("winner", {
+            "winner": winner,
+            "final_price": self.current_game.final_price or 0.0,
+        }))
+
+        # Stop price updates
+        if self._price_update_task:
+            self._price_update_task.cancel()
+            self._price_update_task = None
+
+        if self.on_finished is not None:
+            self.on_finished(self)
+
+    async def _monitor_order_fills(
+        self, fills: Optional[asyncio.Queue], cancels: Optional[asyncio.Task] = None
+    ) -> Optional[Tuple[TrackedOrder, float]]:
+        """
+        Wait on the fill stream for the first fill of one of this round's orders
+        The losing orders' cancel (pre-signed by `cancels` when it is ready) is sent
+        before this returns. Returns the filled order and the microseconds from the
+        socket read to the decision, None if nothing filled in time.
+        """
+        if not self.current_game.placed_orders or fills is None:
             return None
-        
-        # Use real order monitoring
-        filled_order_id = await self.order_executor.monitor_order_fills(
-            self.current_game.placed_orders
+
+        orders = self.current_game.orders
+        deadline = time.monotonic() + self.fill_wait_timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                fill = await asyncio.wait_for(fills.get(), remaining)
+            except asyncio.TimeoutError:
+                return None
+            order = orders.apply_fill(fill.oid, fill.sz)
+            if order is not None:
+                break
+
+        # Fast path: the losing orders are cancelled before anything else happens
+        signed = None
+        if cancels is not None and cancels.done() and not cancels.cancelled() and cancels.exception() is None:
+            signed = cancels.result().get(order.oid)
+        self._cancel_task = asyncio.create_task(
+            self._cancel_losing_orders(self.current_game, order.oid, fill.received_at, signed)
         )
-        
-        if filled_order_id:
-            # Find corresponding ball by order ID
-            for ball in self.current_game.balls:
-                if ball.order_id == filled_order_id:
-                    return ball.ball_name
-        
-        return None
+        # Yield once, so the cancel task sends its request before the state is touched
+        await asyncio.sleep(0)
+        decided_us = (time.monotonic() - fill.received_at) * 1e6
+        self.current_game.filled_order = order.oid
+        return order, decided_us
+
+    async def _cancel_losing_orders(
+        self, game: GameState, filled_order_id: str, filled_at: float, signed: Optional[SignedCancel] = None
+    ):
+        """
+        Bulk-cancel every other placed order and record fill-to-cancel-ack latency (from the socket read)
+        A pre-signed cancel goes out as is; without one the cancel is signed now.
+        """
+        others = game.orders.open_order_ids(exclude=filled_order_id)
+        if not others:
+            return
+        if signed is not None:
+            cancelled = await self.order_executor.send_cancel(signed, game.orders)
+        else:
+            cancelled = await self.order_executor.cancel_orders(others, game.orders)
+        latency_ms = (time.monotonic() - filled_at) * 1000
+        game.cancel_latency_ms = latency_ms
+        self._mark_state_changed(publish_status=False)
+
+        if not cancelled:
+            log.error("❌ [GAME] Cancelling %d losing orders failed after %.1fms", len(others), latency_ms)
+        elif latency_ms > self.cancel_latency_budget_ms:
+            log.warning(
+                "⚠️ [GAME] Losing orders cancelled in %.1fms (budget %.0fms)",
+                latency_ms, self.cancel_latency_budget_ms, extra={"sample_key": "cancel_over_budget"},
+            )
+        else:
+            log.info("✅ [GAME] Losing orders cancelled in %.1fms", latency_ms, extra={"sample_key": "cancel_latency"})
 
     def _determine_fallback_winner(self) -> str:
         """Determine winner when order execution fails - select ball closest to current price"""
@@ -317,7 +545,9 @@ class GameManager:
                 "balls": [],
                 "winner": "",
                 "p0": 0.0,
-                "t0": 0
+                "t0": 0,
+                "cursor": 0,
+                "version": self._state_version
             }
 
         # Calculate p0 (initial price when game started drawing) and t0 (start time as unix timestamp)
@@ -326,7 +556,7 @@ class GameManager:
 
         return {
             "status": self.current_game.status,
-            "realtime_price": self.current_game.price_history,
+            "realtime_price": self.current_game.price_history.to_list(),
             "final_price": self.current_game.final_price or 0.0,
             "balls": [
                 {
@@ -339,8 +569,202 @@ class GameManager:
             ],
             "winner": self.current_game.winner or "",
             "p0": p0,
-            "t0": t0
+            "t0": t0,
+            "cursor": self.current_game.price_history.cursor,  # Pass back as `since` to get only newer prices
+            "version": self._state_version  # Pass back as `wait_version` to long-poll for the next change
+        }
+
+    def _mark_state_changed(self, publish_status: bool = True):
+        """
+        Advance the state version so the next status read re-encodes the snapshot
+        Status transitions are also pushed to stream subscribers; price ticks publish their own event.
+        """
+        self._state_version += 1
+        self._state_changed.set()
+        self._state_changed = asyncio.Event()
+        if publish_status and self.events.has_subscribers:
+            self.events.publish(self.get_status_event())
+
+    @property
+    def state_version(self) -> int:
+        """Monotonic version of the game state, bumped on every change"""
+        return self._state_version
+
+    async def wait_for_state_change(self, version: int, timeout: float) -> int:
+        """
+        Wait until the state version moves past `version` or the timeout elapses
+        Returns the state version at wake-up
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self._state_version <= version:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._state_changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        return self._state_version
+
+    def status_etag(self, version: int, since: Optional[int] = None, binary: bool = False, variant: str = "") -> str:
+        """Build the ETag for a status snapshot version, price cursor, encoding and any other variant"""
+        etag = f"{self._snapshot_epoch}-{version}"
+        if since is not None:
+            etag += f"-{since}"
+        if variant:
+            etag += f"-{variant}"
+        if binary:
+            etag += "-mp"
+        return f'"{etag}"'
+
+    def _refresh_status_snapshot(self):
+        """Rebuild the cached status dict and its JSON encoding if the state moved on"""
+        if self._status_snapshot_version != self._state_version:
+            self._status_data = self.get_game_status()
+            self._status_snapshot = json.dumps(
+                self._status_data, separators=(",", ":")
+            ).encode()
+            self._status_msgpack = None
+            self._downsampled_cache = {}
+            self._status_snapshot_version = self._state_version
+
+    def _pack_status(self, since: int = 0) -> bytes:
+        """Encode the cached status as msgpack with price history as packed float64 columns"""
+        data = dict(self._status_data)
+        if self.current_game:
+            timestamps, prices = self.current_game.price_history.packed_columns(since)
+        else:
+            timestamps, prices = b"", b""
+        data["realtime_price"] = {"timestamp": timestamps, "price": prices}
+        return msgpack.packb(data)
+
+    def get_status_snapshot(self, since: Optional[int] = None, binary: bool = False) -> Tuple[int, bytes]:
+        """
+        Get the current status as (version, encoded body), JSON or msgpack when `binary`
+        The full body is encoded at most once per state version and shared by all pollers.
+        With a `since` cursor only price entries appended after it are included.
+        """
+        self._refresh_status_snapshot()
+        version = self._status_snapshot_version
+        cursor = self._status_data["cursor"]
+        if since is None or since > cursor or not self.current_game:
+            # No cursor, or a cursor from an earlier game - send the full history
+            if not binary:
+                return version, self._status_snapshot
+            if self._status_msgpack is None:
+                self._status_msgpack = self._pack_status()
+            return version, self._status_msgpack
+
+        if binary:
+            return version, self._pack_status(since)
+
+        data = dict(self._status_data)
+        data["realtime_price"] = self.current_game.price_history.to_list(since)
+        return version, json.dumps(data, separators=(",", ":")).encode()
+
+    def get_downsampled_status(
+        self,
+        resolution: Optional[float] = None,
+        max_points: Optional[int] = None,
+        binary: bool = False,
+    ) -> Tuple[int, bytes]:
+        """
+        Get the current status with price history as server-side OHLC bars instead of raw ticks
+        Bars are extended incrementally per resolution; the encoded body is cached per version.
+        """
+        self._refresh_status_snapshot()
+        version = self._status_snapshot_version
+        history = self.current_game.price_history if self.current_game else PriceHistory(1)
+        if resolution is None:
+            resolution = self._downsampler.resolution_for_points(history, max_points)
+        else:
+            resolution = self._downsampler.snap_resolution(resolution)
+
+        key = (resolution, binary)
+        if key not in self._downsampled_cache:
+            resolution, bars = self._downsampler.get_bars(history, resolution)
+            data = dict(self._status_data)
+            data["realtime_price"] = []
+            data["ohlc"] = bars
+            data["resolution"] = resolution
+            if binary:
+                self._downsampled_cache[key] = msgpack.packb(data)
+            else:
+                self._downsampled_cache[key] = json.dumps(data, separators=(",", ":")).encode()
+        return version, self._downsampled_cache[key]
+
+    def get_status_event(self) -> GameEvent:
+        """
+        Wrap the current status snapshot as a stream event without re-encoding it
+        Both encodings are taken now (each cached per version), so JSON and msgpack
+        subscribers see the same state however late they read the event.
+        """
+        _, body = self.get_status_snapshot()
+        _, packed = self.get_status_snapshot(binary=True)
+        return GameEvent("status", encoded_data=body, packed_data=packed)
+
+    def order_state_counts(self) -> Dict[str, int]:
+        """Number of the round's orders in each lifecycle state (the leader's, on read-only workers)"""
+        if self._replica_orders is not None:
+            return dict(self._replica_orders)
+        return self.current_game.orders.state_counts() if self.current_game else {}
+
+    def export_replica(self) -> Dict:
+        """
+        The room state a read-only worker needs to mirror it (price ticks are shipped separately)
+        Orders are summarised as per-state counts; the order index itself stays on the leader.
+        """
+        game = self.current_game
+        return {
+            "version": self._state_version,
+            "epoch": self._snapshot_epoch,
+            "cursor": game.price_history.cursor if game else 0,
+            "game": game.model_dump(mode="json", exclude={"price_history", "orders"}) if game else None,
+            "orders": game.orders.state_counts() if game else None,
+        }
+
+    def apply_replica(self, state: Dict, ticks: List[Tuple[int, float, float]]):
+        """
+        Mirror a room replicated from the leader worker (read-only workers only)
+        `ticks` are (cursor, timestamp, price) entries up to the state's cursor. The
+        leader's state version, snapshot epoch and price cursors are kept, so ETags,
+        wait_version and since give the same answers on every worker.
+        """
+        fields = state["game"]
+        if fields is None:
+            self.current_game = None
+        else:
+            previous = self.current_game
+            if previous is not None and previous.game_id == fields["game_id"]:
+                history = previous.price_history
+            else:
+                history = PriceHistory(self.price_history_capacity)
+            if ticks and ticks[0][0] != history.cursor or not ticks and history.cursor != state["cursor"]:
+                # Restarted on the leader, or we fell behind by more than was fetched
+                history.clear(ticks[0][0] if ticks else state["cursor"])
+            self.current_game = GameState(**fields, price_history=history)
+            publish = self.events.has_subscribers
+            for cursor, timestamp, price in ticks:
+                history.append(timestamp, price)
+                if publish:
+                    self.events.publish(GameEvent("price", {
+                        "timestamp": timestamp,
+                        "price": price,
+                        "cursor": cursor + 1,
+                    }))
+
+        # Price ticks alone do not push a status event, same as on the leader
+        status_fields = {
+            key: value for key, value in (fields or {}).items()
+            if key not in ("current_price", "price_counter", "missed_ticks")
         }
+        status_changed = status_fields != self._replica_fields
+        self._replica_fields = status_fields
+        self._replica_orders = state.get("orders") or {}
+        self._snapshot_epoch = state["epoch"]
+        self._state_version = state["version"] - 1
+        self._mark_state_changed(publish_status=status_changed)
 
     def get_current_game(self) -> Optional[GameState]:
         """Get current game state"""
@@ -354,34 +778,19 @@ class GameManager:
         if self.current_game.status != GameStatus.PREPARING:
             raise ValueError("Game is not in preparing state")
 
-        current_participants = len(self.current_game.participants)
-        missing_participants = 20 - current_participants
-
-        if missing_participants <= 0:
-            raise ValueError("Game already has 20 participants")
+        missing_participants = len(self._free_balls)
 
-        # Generate ball assignments without prices if not done yet
-        if not self.current_game.balls:
-            self.current_game.balls = (
-                self.ball_calculator.generate_empty_ball_assignments()
-            )
+        # A full game that has not started (its start failed) is simply started
+        if missing_participants <= 0 and self._starting is self.current_game:
+            raise ValueError("Game is already starting")
 
         # Auto-generate missing participants
         auto_generated = []
         for i in range(missing_participants):
             auto_uuid = f"auto-participant-{i + 1:02d}"
-
-            # Find next available ball
-            available_balls = [
-                ball for ball in self.current_game.balls if not ball.uuid
-            ]
-            if available_balls:
-                assigned_ball = available_balls[0]
-                assigned_ball.uuid = auto_uuid
-                self.current_game.participants[auto_uuid] = assigned_ball.ball_name
-                auto_generated.append(
-                    {"uuid": auto_uuid, "ball": assigned_ball.ball_name}
-                )
+            assigned_ball = self._assign_ball(auto_uuid)
+            auto_generated.append({"uuid": auto_uuid, "ball": assigned_ball.ball_name})
+        self._mark_state_changed()
 
         # Start the game
         await self.start_game()
@@ -393,9 +802,38 @@ class GameManager:
             "status": self.current_game.status,
         }
 
+    async def withdraw_orders(self):
+        """Stop order execution and cancel the round's resting orders, before the round is dropped"""
+        task, self._execution_task = self._execution_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        if self.current_game is not None:
+            await self._cancel_open_orders(self.current_game)
+
     def reset_game(self):
         """Reset game state for testing"""
         self.current_game = None
+        self._free_balls.clear()
+        self._starting = None
+        self._mark_state_changed()
         if self._price_update_task:
             self._price_update_task.cancel()
             self._price_update_task = None
+        if self._prefetch_task:
+            self._prefetch_task.cancel()
+            self._prefetch_task = None
+        if self._order_prep_task:
+            self._order_prep_task.cancel()
+            self._order_prep_task = None
+        if self._start_retry_task:
+            self._start_retry_task.cancel()
+            self._start_retry_task = None
+        if self._execution_task:
+            self._execution_task.cancel()
+            self._execution_task = None
+        if self._cancel_task:
+            self._cancel_task.cancel()
+            self._cancel_task = None
+        self._prepared_orders = None
@@ -1,175 +1,420 @@
 import asyncio
-import json
-from typing import List, Optional
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
-import websockets
 from async_hyper import AsyncHyper
+from async_hyper.utils.signing import encode_order, orders_to_action
 from async_hyper.utils.types import LimitOrder
 
 from models.ball import BallAssignment, BallType
+from models.order import OrderRegistry
+from services.order_signer import OrderSigner
+from services.price_service import PriceService
+from services.request_scheduler import INFO_WEIGHT, META_WEIGHT, RequestLane, RequestScheduler, action_weight
 
 
-def parse_order_info(resp: dict) -> str:
-    return str(resp["response"]["data"]["statuses"][0]["resting"]["oid"])
+def parse_order_statuses(resp: dict) -> List:
+    """Per-order (or per-cancel) statuses of an exchange response, in request order"""
+    return resp["response"]["data"]["statuses"]
     
 
+# Hyperliquid's tick and lot rule for perps: sizes to the coin's szDecimals, prices to
+# 5 significant figures and at most 6 - szDecimals decimals. The async_hyper revision
+# pinned in requirements.txt (ec335f98) only applies it in the private
+# AsyncHyper._round_sz_px, so it is kept here; check it when bumping async_hyper.
+PRICE_SIGNIFICANT_FIGURES = 5
+PERP_MAX_PRICE_DECIMALS = 6
+
+
+def round_size(sz: float, sz_decimals: int) -> float:
+    """Order size rounded to the coin's lot size"""
+    return round(sz, sz_decimals)
+
+
+def round_price(px: float, sz_decimals: int) -> float:
+    """Perp limit price rounded to what the exchange accepts as a tick"""
+    return round(float(f"{px:.{PRICE_SIGNIFICANT_FIGURES}g}"), PERP_MAX_PRICE_DECIMALS - sz_decimals)
+
+
+def new_cloid() -> str:
+    """Random 128-bit client order id, so an order can be looked up before it has an oid"""
+    return "0x" + os.urandom(16).hex()
+
+
+class PreparedOrder:
+    """One ball's order, rounded and encoded ahead of dispatch"""
+
+    def __init__(self, ball: BallAssignment, target_price: float, cloid: str, encoded: Dict):
+        self.ball = ball
+        self.target_price = target_price
+        self.cloid = cloid  # Client order id, also inside `encoded`
+        self.encoded = encoded  # Wire format inside the bulk action
+
+
+class SignedOrderAction:
+    """A bulk order action for a chunk of prepared orders, signed with its nonce"""
+
+    def __init__(self, orders: List[PreparedOrder], action: Dict, nonce: int, signature: Any):
+        self.orders = orders
+        self.action = action
+        self.nonce = nonce
+        self.signature = signature
+
+
+class SignedCancel:
+    """A cancel action for a set of oids, signed ahead of the moment it is sent"""
+
+    def __init__(self, order_ids: List[str], action: Dict, nonce: int, signature: Any):
+        self.order_ids = order_ids
+        self.action = action
+        self.nonce = nonce
+        self.signature = signature
+
+
+class PreparedOrderBatch:
+    """Signed bulk actions covering every ball, priced around reference_price"""
+
+    def __init__(self, reference_price: float, orders: List[PreparedOrder], actions: List[SignedOrderAction]):
+        self.reference_price = reference_price
+        self.orders = orders
+        self.actions = actions
+        self.prepared_at = time.monotonic()
+
 
 class OrderExecutor:
     """Service for executing orders via async-hyperliquid library"""
 
-    def __init__(self, async_hyper: AsyncHyper):
+    def __init__(
+        self,
+        async_hyper: AsyncHyper,
+        price_service: PriceService,
+        price_max_age: float = 2.0,
+        bulk_chunk_size: int = 20,
+        scheduler: Optional[RequestScheduler] = None,
+        signer: Optional[OrderSigner] = None,
+        info: Optional[Callable[[Dict], Awaitable[Any]]] = None,
+        user: str = "",
+    ):
         self.order_counter = 0
         self.async_hyper = async_hyper
+        self.price_service = price_service
+        self.price_max_age = price_max_age  # Reuse the shared cached price if it is at most this old
+        self.bulk_chunk_size = max(1, bulk_chunk_size)  # Orders per signed bulk action
+        self.scheduler = scheduler or price_service.scheduler  # Shared rate-limit budget
+        self.signer = signer or OrderSigner(async_hyper.account, async_hyper.is_mainnet)
+        self.info = info  # Posts an info request and returns the reply, for order status lookups
+        self.user = user  # Account address the orders are placed for
         self.coin = "BTC"
+        self._asset: Optional[int] = None  # Exchange asset id of self.coin, once resolved
+        self._sz_decimals = 0  # Size decimals of self.coin, resolved with the asset id
+        self._last_nonce = 0
 
-    async def place_orders(self, balls: List[BallAssignment]) -> List[str]:
+    async def warm_up(self):
+        """Resolve the coin's exchange metadata ahead of order placement (once)"""
+        if self._asset is not None:
+            return
+        try:
+            await self._coin_asset(RequestLane.PRICE)
+        except Exception as e:
+            print(f"⚠️ [NETWORK] Order context warm-up failed: {type(e).__name__}: {e}")
+
+    async def _coin_asset(self, lane: RequestLane) -> int:
         """
-        Place all 20 orders asynchronously
+        Exchange asset id of self.coin, looked up through the scheduler on first use
+        The same perp metadata request also gives the coin's size decimals for rounding.
         """
-        order_ids = []
+        if self._asset is None:
+            if self.info is None:
+                raise RuntimeError("Exchange metadata lookups are not configured")
+            meta = await self.scheduler.submit(lane, META_WEIGHT, lambda: self.info({"type": "meta"}))
+            for asset, coin in enumerate(meta["universe"]):
+                if coin["name"] == self.coin:
+                    self._sz_decimals = int(coin["szDecimals"])
+                    self._asset = asset
+                    break
+            else:
+                raise ValueError(f"Unknown coin: {self.coin}")
+        return self._asset
+
+    def _ball_order(self, ball: BallAssignment, mark_px: float) -> Tuple[float, Dict]:
+        """Target price and limit order payload for a ball placed around mark_px"""
+        is_long = ball.ball_name.startswith("B")
+        offset = (int(ball.ball_name[-1:]) + 1) * 1
+        target_price = mark_px - offset if is_long else mark_px + offset
+        payload = {
+            "coin": self.coin,
+            "is_buy": is_long,
+            "sz": (10 + 0.3) / target_price,
+            "px": target_price,
+            "is_market": False,
+            "order_type": LimitOrder.ALO.value,
+        }
+        return target_price, payload
 
+    def _next_nonce(self) -> int:
+        """Millisecond nonce, strictly increasing across this executor's signed actions"""
+        nonce = max(int(time.time() * 1000), self._last_nonce + 1)
+        self._last_nonce = nonce
+        return nonce
+
+    async def prepare_orders(self, balls: List[BallAssignment], mark_px: float) -> PreparedOrderBatch:
+        """
+        Build, round and encode every ball's order, then sign them as bulk actions
+        of up to bulk_chunk_size orders. Nothing is sent and ball state is left
+        untouched until the batch is executed.
+        """
+        asset = await self._coin_asset(RequestLane.ORDER)
+        orders = []
+        for ball in balls:
+            target_price, payload = self._ball_order(ball, mark_px)
+            sz = round_size(payload["sz"], self._sz_decimals)
+            px = round_price(payload["px"], self._sz_decimals)
+            cloid = new_cloid()
+            encoded = encode_order({
+                "asset": asset,
+                "is_buy": payload["is_buy"],
+                "sz": sz,
+                "px": px,
+                "ro": False,
+                "order_type": payload["order_type"],
+                "cloid": cloid,
+            })
+            orders.append(PreparedOrder(ball, target_price, cloid, encoded))
+
+        chunks = [orders[i:i + self.bulk_chunk_size] for i in range(0, len(orders), self.bulk_chunk_size)]
+        actions = [orders_to_action([order.encoded for order in chunk]) for chunk in chunks]
+        # Nonces are fixed in chunk order before signing, however the signer schedules the work
+        nonces = [self._next_nonce() for _ in actions]
+        signatures = await self.signer.sign_all(list(zip(actions, nonces)))
+        signed = [
+            SignedOrderAction(chunk, action, nonce, signature)
+            for chunk, action, nonce, signature in zip(chunks, actions, nonces, signatures)
+        ]
+        return PreparedOrderBatch(mark_px, orders, signed)
+
+    @staticmethod
+    def needs_refresh(batch: PreparedOrderBatch, mark_px: float, tolerance: float) -> bool:
+        """Whether the price has moved too far from the one the batch was priced at"""
+        return abs(mark_px - batch.reference_price) > tolerance
+
+    async def place_orders(
+        self,
+        balls: List[BallAssignment],
+        prepared: Optional[PreparedOrderBatch] = None,
+        tolerance: float = 0.0,
+        registry: Optional[OrderRegistry] = None,
+    ) -> List[str]:
+        """
+        Place all 20 orders as signed bulk actions
+        A prepared batch still within `tolerance` of the current price is dispatched as is,
+        otherwise a fresh batch is built around the current price.
+        Order states are recorded in `registry` when one is given.
+        """
         try:
-            print(f"🌐 [NETWORK] Getting market price for {self.coin}...")
-            mark_px = await self.async_hyper.get_market_price(self.coin)
-            print(f"✅ [NETWORK] Market price retrieved: {mark_px}")
+            mark_px = await self.price_service.get_current_price(max_age=self.price_max_age)
+            print(f"✅ [NETWORK] Market price for {self.coin}: {mark_px}")
         except Exception as e:
             print(f"❌ [NETWORK] Failed to get market price: {type(e).__name__}: {e}")
             raise
 
-        tasks = []
-        for ball in balls:
-            ball_name = ball.ball_name
-            ball.position = (
-                BallType.LONG if ball_name.startswith("B") else BallType.SHORT
+        if prepared is None or self.needs_refresh(prepared, mark_px, tolerance):
+            prepared = await self.prepare_orders(balls, mark_px)
+        return await self.execute_prepared(prepared, registry)
+
+    async def execute_prepared(
+        self, batch: PreparedOrderBatch, registry: Optional[OrderRegistry] = None
+    ) -> List[str]:
+        """
+        Apply a prepared batch's target prices and post its signed bulk actions
+        Orders whose bulk request failed outright (no status came back) are looked up
+        by cloid and re-sent one by one only if the exchange never received them. Orders
+        the exchange answered with an error are recorded as rejected and not re-sent:
+        the same price would be rejected again.
+        """
+        for order in batch.orders:
+            order.ball.position = (
+                BallType.LONG if order.ball.ball_name.startswith("B") else BallType.SHORT
             )
+            order.ball.target_price = order.target_price
+            if registry is not None:
+                registry.register(order.ball, float(order.encoded["s"]))
 
-            offset = (int(ball_name[-1:]) + 1) * 1
-            if ball.position == BallType.LONG:
-                ball.target_price = mark_px - offset
-            else:
-                ball.target_price = mark_px + offset
+        print(f"🌐 [NETWORK] Placing {len(batch.orders)} orders in {len(batch.actions)} bulk request(s)...")
+        unanswered = await asyncio.gather(*(self._post_bulk(signed, registry) for signed in batch.actions))
 
-            task = asyncio.create_task(self._place_single_order(ball))
-            tasks.append(task)
+        failed = [order for orders in unanswered for order in orders]
+        if failed:
+            print(f"🔄 [NETWORK] Checking {len(failed)} unanswered orders before retrying")
+            await asyncio.gather(*(self._recover_order(order, registry) for order in failed))
 
-        # Wait for all orders to be placed
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        return [order.ball.order_id for order in batch.orders if order.ball.order_id]
 
-        for result in results:
-            if result:  # 确保不为空
-                order_ids.append(result)
-            else:
-                print(f"Order placement failed: {result}")
+    async def _post_bulk(
+        self, signed: SignedOrderAction, registry: Optional[OrderRegistry] = None
+    ) -> List[PreparedOrder]:
+        """
+        Send one pre-signed bulk action and map its statuses back to the balls
+        Returns the orders that got no status at all, for the per-order retry.
+        """
+        try:
+            resp = await self.scheduler.submit(
+                RequestLane.ORDER,
+                action_weight(len(signed.orders)),
+                lambda: self.async_hyper.exchange.post_action_with_sig(
+                    signed.action, signed.signature, signed.nonce
+                ),
+            )
+            statuses = parse_order_statuses(resp)
+        except Exception as e:
+            print(f"❌ [NETWORK] Bulk order request failed: {type(e).__name__}: {e}")
+            statuses = []
 
-        return order_ids
+        unanswered = []
+        for i, order in enumerate(signed.orders):
+            if i >= len(statuses):
+                order.ball.order_id = ""
+                unanswered.append(order)
+                continue
+            self._apply_status(order, statuses[i], registry)
+        return unanswered
 
-    async def _place_single_order(self, ball: BallAssignment) -> str:
-        """Place a single order"""
+    def _apply_status(self, order: PreparedOrder, status: Dict, registry: Optional[OrderRegistry] = None):
+        """Record one order's exchange status on its ball and in the registry"""
+        placed = status.get("resting") or status.get("filled")
+        order.ball.order_id = str(placed["oid"]) if placed else ""
+        if not placed:
+            print(f"❌ [NETWORK] Order rejected for {order.ball.ball_name}: {status.get('error', status)}")
+        if registry is not None:
+            registry.record_status(order.ball.ball_name, status)
 
-        is_buy = True if ball.position == BallType.LONG else False
-        sz = (10 + 0.3) / ball.target_price
-        payload = {
-            "coin": self.coin,
-            "is_buy": is_buy,
-            "sz": sz,
-            "px": ball.target_price,
-            "is_market": False,
-            "order_type": LimitOrder.ALO.value,
-        }
-        oid = ""
+    async def _order_status(self, order: PreparedOrder) -> Optional[Dict]:
+        """The exchange's record of an order, looked up by cloid; None if it never arrived"""
+        if self.info is None or not self.user:
+            raise RuntimeError("Order status lookups are not configured")
+        resp = await self.scheduler.submit(
+            RequestLane.ORDER,
+            INFO_WEIGHT,
+            lambda: self.info({"type": "orderStatus", "user": self.user, "oid": order.cloid}),
+        )
+        if resp.get("status") != "order":
+            return None  # unknownOid
+        return resp["order"]
+
+    async def _recover_order(self, order: PreparedOrder, registry: Optional[OrderRegistry] = None):
+        """
+        Settle an order whose bulk request got no status
+        The request may have reached the exchange before it failed (e.g. a timeout),
+        so the order is re-sent only once a lookup by its cloid shows the exchange
+        never saw it. When that cannot be confirmed it is not re-sent.
+        """
+        try:
+            found = await self._order_status(order)
+        except Exception as e:
+            print(f"❌ [NETWORK] Could not look up {order.ball.ball_name}'s order, not re-sending: {type(e).__name__}: {e}")
+            order.ball.order_id = ""
+            if registry is not None:
+                registry.record_rejection(order.ball.ball_name, f"Status unknown: {type(e).__name__}: {e}")
+            return
+
+        if found is None:
+            await self._place_single_order(order, registry)
+            return
+
+        details = found.get("order", {})
+        state = found.get("status")
+        print(f"🔎 [NETWORK] {order.ball.ball_name}'s order reached the exchange ({state}), not re-sending")
+        if state == "open":
+            status = {"resting": {"oid": details["oid"]}}
+        elif state == "filled":
+            status = {"filled": {"oid": details["oid"], "totalSz": details.get("origSz", order.encoded["s"])}}
+        else:
+            status = {"error": f"Order {state}"}
+        self._apply_status(order, status, registry)
+
+    async def _place_single_order(self, order: PreparedOrder, registry: Optional[OrderRegistry] = None) -> str:
+        """
+        Place a single prepared order (same cloid) as its own signed action
+        An error status from the exchange is recorded as the order's rejection as is;
+        only a request that fails without a status is recorded from the exception.
+        """
+        ball = order.ball
+        ball.order_id = ""
         try:
             print(f"🌐 [NETWORK] Placing order for {ball.ball_name}...")
-            resp = await self.async_hyper.place_order(**payload)
-            print(f"✅ [NETWORK] Order placed successfully for {ball.ball_name}")
-            oid = parse_order_info(resp)
+            action = orders_to_action([order.encoded])
+            nonce = self._next_nonce()
+            signature = await self.signer.sign(action, nonce)
+            resp = await self.scheduler.submit(
+                RequestLane.ORDER,
+                action_weight(),
+                lambda: self.async_hyper.exchange.post_action_with_sig(action, signature, nonce),
+            )
+            self._apply_status(order, parse_order_statuses(resp)[0], registry)
+            if ball.order_id:
+                print(f"✅ [NETWORK] Order placed successfully for {ball.ball_name}")
         except Exception as e:
             print(f"❌ [NETWORK] Order placement failed for {ball.ball_name}: {type(e).__name__}: {e}")
-            # 如果异常包含order ID信息，尝试提取
-            if isinstance(e, dict) and 'oid' in e:
-                oid = str(e['oid'])
-                print(f"🔄 [NETWORK] Extracted order ID from exception: {oid}")
-            else:
-                oid = ""  # 真正的失败，返回空字符串
-                print(f"❌ [NETWORK] No order ID found in exception")
+            if registry is not None:
+                registry.record_rejection(ball.ball_name, f"{type(e).__name__}: {e}")
 
-        ball.order_id = oid
+        return ball.order_id
 
-        return oid
+    @staticmethod
+    def _cancel_action(asset: int, order_ids: List[str]) -> Dict:
+        return {"type": "cancel", "cancels": [{"a": asset, "o": int(oid)} for oid in order_ids]}
 
-    async def cancel_orders(self, order_ids: List[str]) -> bool:
+    async def prepare_cancels(self, order_ids: List[str]) -> Dict[str, SignedCancel]:
         """
-        Cancel multiple orders
+        Pre-sign, for each order, the cancel of all the others
+        Keyed by oid: the action to send as is if that order fills first.
+        """
+        asset = await self._coin_asset(RequestLane.CANCEL)
+        plans = []
+        for winner in order_ids:
+            others = [oid for oid in order_ids if oid != winner]
+            plans.append((winner, others, self._cancel_action(asset, others), self._next_nonce()))
+        signatures = await self.signer.sign_all([(action, nonce) for _, _, action, nonce in plans])
+        return {
+            winner: SignedCancel(others, action, nonce, signature)
+            for (winner, others, action, nonce), signature in zip(plans, signatures)
+        }
+
+    async def send_cancel(self, signed: SignedCancel, registry: Optional[OrderRegistry] = None) -> bool:
+        """
+        Send a signed cancel on the cancel lane
+        With the lane free the request leaves before this coroutine first suspends.
         """
-        cancels = [(self.coin, int(oid)) for oid in order_ids]
         try:
-            resp = await self.async_hyper.cancel_orders(cancels)
+            resp = await self.scheduler.submit(
+                RequestLane.CANCEL,
+                action_weight(len(signed.order_ids)),
+                lambda: self.async_hyper.exchange.post_action_with_sig(signed.action, signed.signature, signed.nonce),
+            )
+            if registry is not None:
+                try:
+                    registry.record_cancels(signed.order_ids, parse_order_statuses(resp))
+                except (KeyError, TypeError):
+                    pass  # No per-order statuses (e.g. the whole request was rejected)
             print(f"Cancel response: {resp}")
         except Exception as e:
             print(f"Order cancellation failed: {e}")
             return False
 
-        print(f"Cancelled {len(order_ids)} orders")
+        print(f"Cancelled {len(signed.order_ids)} orders")
         return True
 
-    async def monitor_order_fills(self, order_ids: List[str]) -> Optional[str]:
+    async def cancel_orders(self, order_ids: List[str], registry: Optional[OrderRegistry] = None) -> bool:
         """
-        Monitor order fills via Hyperliquid WebSocket
+        Cancel multiple orders
         """
-        filled_oid = None
-        # WS_URL = "wss://api.hyperliquid.xyz/ws"
-        WS_URL = "wss://api.hyperliquid-testnet.xyz/ws"
-        
         try:
-            print(f"🌐 [NETWORK] Connecting to WebSocket: {WS_URL}")
-            print(f"📋 [NETWORK] Monitoring {len(order_ids)} orders: {order_ids}")
-            async with websockets.connect(WS_URL) as ws:
-                print(f"✅ [NETWORK] WebSocket connected successfully")
-                sub_msg = {
-                    "method": "subscribe",
-                    "subscription": {
-                        "type": "order_fills",
-                        "user": self.async_hyper.address,
-                    },
-                }
-                print(f"📤 [NETWORK] Sending subscription message: {sub_msg}")
-                await ws.send(json.dumps(sub_msg))
-                print(f"✅ [NETWORK] Subscription message sent")
-                
-                message_count = 0
-                while True:
-                    try:
-                        print(f"⏳ [NETWORK] Waiting for WebSocket message #{message_count + 1}...")
-                        ws_msg = await ws.recv()
-                        message_count += 1
-                        print(f"📨 [NETWORK] WebSocket message #{message_count}: {ws_msg}")
-
-                        msg = json.loads(ws_msg)
-                        channel = msg.get("channel", "unknown")
-                        data = msg.get("data", {})
-                        
-                        print(f"📊 [NETWORK] Channel: {channel}, Data keys: {list(data.keys())}")
-                        
-                        if data.get("isSnapshot"):
-                            print(f"📸 [NETWORK] Snapshot message, skipping...")
-                            continue
-                        if channel == "order_fills":
-                            fills = data.get("fills", [])
-                            if fills:
-                                oid = str(fills[0]["oid"])  # 确保是字符串格式
-                                filled_oid = oid
-                                print(f"🎉 [NETWORK] Order filled: {oid}")
-                                break
-                            else:
-                                print(f"⚠️ [NETWORK] Order fills message but no fills data")
-                        else:
-                            print(f"ℹ️ [NETWORK] Other channel message: {channel}")
-                    except Exception as e:
-                        print(f"❌ [NETWORK] Error processing WebSocket message: {type(e).__name__}: {e}")
-                        break
-                        
+            asset = await self._coin_asset(RequestLane.CANCEL)
+            action = self._cancel_action(asset, order_ids)
+            nonce = self._next_nonce()
+            # Cancels sign on the signer's urgent worker, never behind a pre-sign refresh
+            signature = await self.signer.sign(action, nonce, urgent=True)
         except Exception as e:
-            print(f"❌ [NETWORK] WebSocket connection failed: {type(e).__name__}: {e}")
-            print(f"🔍 [NETWORK] Error details: {str(e)}")
-            return None
-
-        return filled_oid
+            print(f"Order cancellation failed: {e}")
+            return False
+        return await self.send_cancel(SignedCancel(order_ids, action, nonce, signature), registry)
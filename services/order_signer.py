@@ -0,0 +1,95 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from async_hyper.utils.signing import sign_action
+from eth_account import Account
+
+SIGNING_MODES = ("inline", "thread", "process")
+
+# Per-process signing account, set by the process pool initializer
+_worker_account = None
+_worker_is_mainnet = True
+
+
+def _init_worker(key: bytes, is_mainnet: bool):
+    global _worker_account, _worker_is_mainnet
+    _worker_account = Account.from_key(key)
+    _worker_is_mainnet = is_mainnet
+
+
+def _sign_in_worker(action: Dict, nonce: int) -> Any:
+    return sign_action(_worker_account, action, None, nonce, _worker_is_mainnet)
+
+
+class OrderSigner:
+    """
+    Signs exchange actions inline, or in a thread or process pool so the
+    secp256k1/keccak work does not hold up the event loop
+    Nonces are chosen by the caller before signing, so the signed result is
+    the same whichever worker finishes first. Urgent signatures (cancels) get a
+    worker of their own, so they never queue behind a batch of order signing.
+    """
+
+    def __init__(self, account, is_mainnet: bool, mode: str = "inline", workers: int = 2):
+        if mode not in SIGNING_MODES:
+            raise ValueError(f"Unknown signing mode: {mode}")
+        self.account = account
+        self.is_mainnet = is_mainnet
+        self.mode = mode
+        self.workers = max(1, workers)
+        self._pool: Optional[Executor] = None
+        self._urgent_pool: Optional[Executor] = None
+
+    def _new_pool(self, workers: int, name: str) -> Executor:
+        if self.mode == "process":
+            return ProcessPoolExecutor(
+                workers,
+                initializer=_init_worker,
+                initargs=(bytes(self.account.key), self.is_mainnet),
+            )
+        return ThreadPoolExecutor(workers, thread_name_prefix=name)
+
+    def _get_pool(self, urgent: bool = False) -> Executor:
+        if urgent:
+            if self._urgent_pool is None:
+                self._urgent_pool = self._new_pool(1, "signer-urgent")
+            return self._urgent_pool
+        if self._pool is None:
+            self._pool = self._new_pool(self.workers, "signer")
+        return self._pool
+
+    def start(self):
+        """Spin the pool's workers up ahead of the first signature"""
+        if self.mode == "inline":
+            return
+        pool = self._get_pool()
+        for _ in range(self.workers):
+            pool.submit(int)
+        self._get_pool(urgent=True).submit(int)
+
+    async def sign(self, action: Dict, nonce: int, urgent: bool = False) -> Any:
+        """Sign one action; urgent ones run on the dedicated worker, ahead of any backlog"""
+        if self.mode == "inline":
+            return sign_action(self.account, action, None, nonce, self.is_mainnet)
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool(urgent)
+        if self.mode == "process":
+            return await loop.run_in_executor(pool, _sign_in_worker, action, nonce)
+        return await loop.run_in_executor(
+            pool, sign_action, self.account, action, None, nonce, self.is_mainnet
+        )
+
+    async def sign_all(self, items: List[Tuple[Dict, int]]) -> List[Any]:
+        """Sign (action, nonce) pairs, in parallel when pooled; results keep input order"""
+        if self.mode == "inline":
+            return [await self.sign(action, nonce) for action, nonce in items]
+        return await asyncio.gather(*(self.sign(action, nonce) for action, nonce in items))
+
+    def close(self):
+        for pool in (self._pool, self._urgent_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        self._urgent_pool = None
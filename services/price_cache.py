@@ -0,0 +1,56 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+
+class PriceCache:
+    """
+    Single shared price with max-age reads
+    A read younger than `max_age` is served from memory. Callers that miss share
+    one in-flight fetch instead of each starting their own round trip.
+    """
+
+    def __init__(self, fetch: Callable[[], Awaitable[float]]):
+        self._fetch = fetch
+        self.price: Optional[float] = None
+        self._updated_at = 0.0  # time.monotonic() of the last update
+        self._inflight: Optional[asyncio.Future] = None
+        self.fetches = 0  # Network fetches actually issued
+
+    @property
+    def age(self) -> float:
+        """Seconds since the cached price was updated, inf if never"""
+        if self.price is None:
+            return float("inf")
+        return time.monotonic() - self._updated_at
+
+    def put(self, price: float):
+        """Store a price pushed from elsewhere (e.g. the streaming feed)"""
+        self.price = price
+        self._updated_at = time.monotonic()
+
+    async def get(self, max_age: float = 0.0) -> float:
+        """Get a price no older than max_age seconds, fetching (or joining a fetch) if needed"""
+        if self.price is not None and self.age <= max_age:
+            return self.price
+
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._refresh())
+        # Shield so one cancelled caller does not cancel the fetch the others are waiting on
+        return await asyncio.shield(self._inflight)
+
+    def prefetch(self, max_age: float = 0.0):
+        """Start a background refresh unless the price is fresh enough or a fetch is in flight"""
+        if (self.price is None or self.age > max_age) and self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._refresh())
+            # Nobody may await a prefetch - consume its outcome so failures are not reported as unhandled
+            self._inflight.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    async def _refresh(self) -> float:
+        try:
+            self.fetches += 1
+            price = await self._fetch()
+            self.put(price)
+            return price
+        finally:
+            self._inflight = None
@@ -0,0 +1,107 @@
+import math
+from typing import Dict, List, Optional, Tuple
+
+from models.price_history import PriceHistory
+
+# Bucket widths in seconds that chart clients can get; requests snap up to the next one
+RESOLUTION_STEPS = [0.1, 0.2, 0.5, 1, 2, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800, 3600]
+
+
+class OHLCSeries:
+    """
+    OHLC bars for one bucket width, extended incrementally from a PriceHistory
+    Bars cover the same window as the history: once ticks are evicted from the ring
+    buffer, the bars before the oldest retained tick's bucket are dropped too.
+    """
+
+    def __init__(self, resolution: float):
+        self.resolution = resolution
+        self.bars: List[List[float]] = []  # [bucket_start, open, high, low, close]
+        self._next_cursor = 0
+
+    def update(self, history: PriceHistory):
+        """Fold ticks appended since the last update into the bars"""
+        if history.cursor < self._next_cursor:
+            # History was cleared for a new round - start over
+            self.bars = []
+            self._next_cursor = 0
+
+        for timestamps, prices in history.segments(self._next_cursor):
+            for timestamp, price in zip(timestamps, prices):
+                bucket = self._bucket(timestamp)
+                if self.bars and bucket <= self.bars[-1][0]:
+                    bar = self.bars[-1]
+                    bar[2] = max(bar[2], price)
+                    bar[3] = min(bar[3], price)
+                    bar[4] = price
+                else:
+                    self.bars.append([bucket, price, price, price, price])
+        self._next_cursor = history.cursor
+        self._trim(history)
+
+    def _bucket(self, timestamp: float) -> float:
+        return round(math.floor(timestamp / self.resolution) * self.resolution, 3)
+
+    def _trim(self, history: PriceHistory):
+        """Drop bars that end before the oldest tick the ring buffer still holds"""
+        bounds = history.time_bounds()
+        if bounds is None or not self.bars:
+            return
+        oldest = self._bucket(bounds[0])
+        stale = 0
+        while stale < len(self.bars) and self.bars[stale][0] < oldest:
+            stale += 1
+        if stale:
+            del self.bars[:stale]
+
+    def to_list(self) -> List[Dict[str, float]]:
+        return [
+            {"timestamp": bucket, "open": open_, "high": high, "low": low, "close": close}
+            for bucket, open_, high, low, close in self.bars
+        ]
+
+
+class PriceDownsampler:
+    """Per-game cache of OHLC series, one per resolution step"""
+
+    def __init__(self):
+        self._series: Dict[float, OHLCSeries] = {}
+
+    @staticmethod
+    def snap_resolution(resolution: float) -> float:
+        """Round a requested bucket width up to the nearest supported step"""
+        for step in RESOLUTION_STEPS:
+            if step >= resolution:
+                return step
+        return RESOLUTION_STEPS[-1]
+
+    @staticmethod
+    def resolution_for_points(history: PriceHistory, max_points: int) -> float:
+        """Smallest supported step that keeps the series within max_points bars"""
+        bounds = history.time_bounds()
+        if bounds is None:
+            return RESOLUTION_STEPS[0]
+
+        first, last = bounds
+        for step in RESOLUTION_STEPS:
+            if math.floor(last / step) - math.floor(first / step) + 1 <= max_points:
+                return step
+        return RESOLUTION_STEPS[-1]
+
+    def get_bars(
+        self,
+        history: PriceHistory,
+        resolution: Optional[float] = None,
+        max_points: Optional[int] = None,
+    ) -> Tuple[float, List[Dict[str, float]]]:
+        """Get (resolution, OHLC bars), by explicit bucket width or by a point budget"""
+        if resolution is not None:
+            step = self.snap_resolution(resolution)
+        else:
+            step = self.resolution_for_points(history, max_points)
+
+        series = self._series.get(step)
+        if series is None:
+            series = self._series[step] = OHLCSeries(step)
+        series.update(history)
+        return step, series.to_list()
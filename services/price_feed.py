@@ -0,0 +1,89 @@
+import asyncio
+import json
+import time
+from typing import Callable, Optional
+
+import websockets
+
+MAINNET_WS_URL = "wss://api.hyperliquid.xyz/ws"
+TESTNET_WS_URL = "wss://api.hyperliquid-testnet.xyz/ws"
+
+
+class StreamingPriceFeed:
+    """
+    Keeps the latest mid price in memory from the exchange's allMids WebSocket channel
+    The connection is re-established with backoff; allMids re-sends the full mids map
+    on every subscribe, so a reconnect resumes from the current price. Each update is
+    handed to `on_price`, typically PriceCache.put.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        coin: str = "BTC",
+        stale_after: float = 3.0,
+        connect: Callable = websockets.connect,
+        on_price: Optional[Callable[[float], None]] = None,
+    ):
+        self.ws_url = ws_url  # Point at a local stand-in server to drive the feed in tests
+        self.coin = coin
+        self.stale_after = stale_after
+        self._connect = connect
+        self.on_price = on_price
+        self.latest_price: Optional[float] = None
+        self._updated_at = 0.0  # time.monotonic() of the last price update
+        self.reconnects = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background subscription if it is not running"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background subscription"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the stream delivered a price within stale_after seconds (else callers fall back to REST)"""
+        return self.latest_price is not None and time.monotonic() - self._updated_at <= self.stale_after
+
+    async def _run(self):
+        """Subscribe to allMids and reconnect with exponential backoff"""
+        backoff = 0.5
+        while True:
+            try:
+                async with self._connect(self.ws_url) as ws:
+                    await ws.send(json.dumps({"method": "subscribe", "subscription": {"type": "allMids"}}))
+                    print(f"✅ [PRICE] Price stream subscribed: {self.ws_url}")
+                    backoff = 0.5
+                    while True:
+                        # A connection that stops delivering is treated as dead
+                        message = await asyncio.wait_for(ws.recv(), self.stale_after * 2)
+                        self._handle_message(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ [PRICE] Price stream error: {type(e).__name__}: {e}")
+
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 10.0)
+
+    def _handle_message(self, message):
+        msg = json.loads(message)
+        if msg.get("channel") != "allMids":
+            return
+        mid = msg.get("data", {}).get("mids", {}).get(self.coin)
+        if mid is not None:
+            self.latest_price = float(mid)
+            self._updated_at = time.monotonic()
+            if self.on_price is not None:
+                self.on_price(self.latest_price)
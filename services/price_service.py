@@ -1,18 +1,52 @@
+from typing import Optional
+
 from async_hyper import AsyncHyper
 
+from services.price_cache import PriceCache
+from services.price_feed import StreamingPriceFeed
+from services.request_scheduler import INFO_WEIGHT, RequestLane, RequestScheduler
+
 
 class PriceService:
     """Service for fetching BTC price data"""
 
-    def __init__(self, async_hyper: AsyncHyper):
+    def __init__(
+        self,
+        async_hyper: AsyncHyper,
+        feed: Optional[StreamingPriceFeed] = None,
+        max_age: float = 0.5,
+        scheduler: Optional[RequestScheduler] = None,
+    ):
         self.async_hyper = async_hyper
+        self.scheduler = scheduler or RequestScheduler()
+        self.max_age = max_age  # Default freshness for reads
+        # One cache shared by every consumer; the streaming feed keeps it warm when enabled
+        self.cache = PriceCache(self._fetch_market_price)
+        self.feed = feed
+        if feed is not None:
+            feed.on_price = self.cache.put
 
-    async def get_current_price(self) -> float:
+    async def _fetch_market_price(self) -> float:
+        return await self.scheduler.submit(
+            RequestLane.PRICE, INFO_WEIGHT, lambda: self.async_hyper.get_market_price("BTC")
+        )
+
+    async def get_current_price(self, max_age: Optional[float] = None) -> float:
         """
         Get current BTC perp market price
+        While the streaming feed is fresh its latest price is served as is. Otherwise
+        the shared cache answers when it is younger than max_age, else the price is
+        fetched over REST (concurrent misses share one request).
         """
-        price = await self.async_hyper.get_market_price("BTC")
-        return price
+        if self.feed is not None and self.feed.is_fresh:
+            return self.feed.latest_price
+        return await self.cache.get(self.max_age if max_age is None else max_age)
+
+    def prefetch(self, max_age: Optional[float] = None):
+        """Refresh the shared cache in the background so the next read is served from memory"""
+        if self.feed is not None and self.feed.is_fresh:
+            return  # The stream keeps the price current; no REST round trip needed
+        self.cache.prefetch(self.max_age if max_age is None else max_age)
 
     async def get_initial_price(self) -> float:
         """Get initial price for game start"""
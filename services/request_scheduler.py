@@ -0,0 +1,180 @@
+import asyncio
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+class RequestLane(IntEnum):
+    """Priority lanes, most urgent first"""
+    CANCEL = 0
+    ORDER = 1
+    PRICE = 2
+
+
+# Request weights as the exchange counts them against the per-IP budget
+INFO_WEIGHT = 2  # allMids, l2Book and similar light info requests
+META_WEIGHT = 20  # Other info requests, e.g. asset metadata
+
+
+def action_weight(batch_length: int = 1) -> int:
+    """Weight of an exchange action carrying batch_length orders or cancels"""
+    return 1 + batch_length // 40
+
+
+class TokenBucket:
+    """Request weight budget refilled continuously at rate per second, up to capacity"""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self._updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def wait_time(self, weight: float) -> float:
+        """Seconds until `weight` tokens are available (0 if they are now)"""
+        self._refill()
+        # A request heavier than the whole bucket goes out on a full bucket and leaves it in debt
+        weight = min(weight, self.capacity)
+        if self.tokens >= weight:
+            return 0.0
+        return (weight - self.tokens) / self.rate
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def take(self, weight: float):
+        self._refill()
+        self.tokens -= weight
+
+
+class _Request:
+    def __init__(self, lane: RequestLane, weight: int, call: Callable[[], Awaitable[Any]]):
+        self.lane = lane
+        self.weight = weight
+        self.call = call
+        self.future = asyncio.get_running_loop().create_future()
+        self.submitted_at = time.monotonic()
+
+
+class RequestScheduler:
+    """
+    Single dispatcher for exchange requests
+    Requests wait in priority lanes (cancels, then orders, then price reads) and
+    are released only when the shared weight budget allows, so a burst at
+    execution time stays under the exchange's rate limit and a cancel never
+    queues behind a price poll. Dispatched requests run concurrently.
+    """
+
+    def __init__(self, weight_per_minute: int = 1200, slow_wait: float = 0.1):
+        self.bucket = TokenBucket(weight_per_minute, weight_per_minute / 60.0)
+        self.slow_wait = slow_wait  # Queueing delays above this (seconds) are logged
+        self._queue: List = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._inflight = set()  # Dispatched requests, referenced until they finish
+        self._stats = {lane: {"requests": 0, "weight": 0, "wait_total": 0.0, "wait_max": 0.0} for lane in RequestLane}
+
+    async def submit(self, lane: RequestLane, weight: int, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Queue a request in its lane and return its result once it has been sent and answered
+        With nothing queued and budget to spare the request is sent from the caller's own
+        task right away, without waiting a loop turn for the dispatcher.
+        """
+        if not self._queue and self.bucket.wait_time(weight) == 0:
+            self.bucket.take(weight)
+            self._record(lane, weight, time.monotonic())
+            return await call()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._dispatch_loop())
+
+        request = _Request(lane, weight, call)
+        heapq.heappush(self._queue, (lane, next(self._seq), request))
+        self._wakeup.set()
+        return await request.future
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for _, _, request in self._queue:
+            request.future.cancel()
+        self._queue = []
+
+    async def _dispatch_loop(self):
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            _, _, request = self._queue[0]
+            if request.future.done():
+                # The caller gave up while queued
+                heapq.heappop(self._queue)
+                continue
+
+            wait = self.bucket.wait_time(request.weight)
+            if wait > 0:
+                # Wake early if a more urgent request arrives meanwhile
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            heapq.heappop(self._queue)
+            self.bucket.take(request.weight)
+            self._record(request.lane, request.weight, request.submitted_at)
+            task = asyncio.create_task(self._execute(request))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _execute(self, request: _Request):
+        try:
+            result = await request.call()
+        except Exception as e:
+            if not request.future.done():
+                request.future.set_exception(e)
+        else:
+            if not request.future.done():
+                request.future.set_result(result)
+
+    def _record(self, lane: RequestLane, weight: int, submitted_at: float):
+        waited = time.monotonic() - submitted_at
+        stats = self._stats[lane]
+        stats["requests"] += 1
+        stats["weight"] += weight
+        stats["wait_total"] += waited
+        stats["wait_max"] = max(stats["wait_max"], waited)
+        if waited > self.slow_wait:
+            print(f"⚠️ [NETWORK] {lane.name.lower()} request queued {waited * 1000:.0f}ms for rate limit")
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-lane request counts, weight used and queueing delay (ms)"""
+        report = {}
+        for lane, stats in self._stats.items():
+            count = stats["requests"]
+            report[lane.name.lower()] = {
+                "requests": count,
+                "weight": stats["weight"],
+                "avg_wait_ms": round(stats["wait_total"] / count * 1000, 3) if count else 0.0,
+                "max_wait_ms": round(stats["wait_max"] * 1000, 3),
+            }
+        report["queued"] = len(self._queue)
+        report["available_weight"] = round(self.bucket.available(), 1)
+        return report
@@ -0,0 +1,386 @@
+import asyncio
+import os
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from models.game import GameStatus
+from services.admission_queue import AdmissionQueue
+from services.exchange_context import ExchangeContext
+from services.game_manager import GameManager
+from services.round_scheduler import RoundScheduler
+
+
+class RoomRegistry:
+    """
+    Concurrent game rooms keyed by game_id, each one a GameManager
+    All rooms share one exchange context (HTTP session, price feed, fill stream,
+    rate-limit budget). New players go to the oldest room still filling. When
+    MAX_ROOMS rounds are live, joiners wait in an admission queue and are
+    seated in bulk as soon as a round finishes and frees a slot.
+    """
+
+    def __init__(self, exchange: Optional[ExchangeContext] = None):
+        self.exchange = exchange or ExchangeContext()
+        self.max_rooms = int(os.getenv("MAX_ROOMS", "500"))
+        # Finished rooms stay readable for this long (seconds) before they are dropped
+        self.room_retention = float(os.getenv("ROOM_RETENTION", "300"))
+
+        self.rooms: Dict[str, GameManager] = {}
+        self._open_rooms: Dict[str, GameManager] = {}  # Rooms still filling, oldest first
+        self._player_rooms: Dict[str, str] = {}  # participant uuid -> game_id
+        self._latest: Optional[GameManager] = None
+        self._lock = asyncio.Lock()  # Guards room selection and creation
+
+        self.queue = AdmissionQueue(
+            max_size=int(os.getenv("MAX_QUEUE", "10000")),
+            ticket_ttl=float(os.getenv("QUEUE_TICKET_TTL", "60")),
+        )
+        # Running estimate of a round's length (start to DONE), for queue ETAs
+        self.round_seconds = float(os.getenv("ROUND_DURATION_ESTIMATE", "90"))
+        self._admission_task: Optional[asyncio.Task] = None
+
+        # Called whenever a round starts or finishes, or the rooms are reset
+        self.on_round_change: Optional[Callable[[], None]] = None
+        self.round_scheduler = RoundScheduler(self)
+        self.on_round_change = self.round_scheduler.wake
+
+        # On read-only workers the rooms are mirrors of the leader's, fed by the worker coordinator
+        self.read_only = False
+        self.replica_default: Optional[str] = None
+        self._placeholder: Optional[GameManager] = None
+
+    async def startup(self):
+        await self.exchange.start()
+        self.round_scheduler.start()
+
+    async def stand_down(self):
+        """
+        Stop running rounds after this worker lost leadership; the exchange stays connected
+        Order execution is stopped and resting orders are cancelled first, so no
+        orphaned orders stay on the book for the new leader's rounds.
+        """
+        await self.round_scheduler.stop()
+        await self.reset()
+
+    async def shutdown(self):
+        await self.round_scheduler.stop()
+        await self.reset()
+        if self._admission_task:
+            self._admission_task.cancel()
+            self._admission_task = None
+        await self.exchange.close()
+
+    def get(self, game_id: str) -> Optional[GameManager]:
+        return self.rooms.get(game_id)
+
+    async def create_room(self) -> GameManager:
+        """Open a new empty room"""
+        self.retire_finished()
+        if self._live_room_count() >= self.max_rooms:
+            raise ValueError("All rooms are full")
+        room = GameManager(self.exchange)
+        room.on_started = self._room_started
+        room.on_finished = self._room_finished
+        game_id = await room.create_new_game()
+        self.rooms[game_id] = room
+        self._open_rooms[game_id] = room
+        self._latest = room
+        return room
+
+    async def open_lobby(self) -> Optional[GameManager]:
+        """Open the next round's room unless one is already filling; returns the new room"""
+        if self.queue:
+            return None  # Free slots go to queued players first
+        async with self._lock:
+            if self._first_open_room() is not None:
+                return None
+            try:
+                room = await self.create_room()
+            except ValueError:
+                return None  # Every slot is busy until a round finishes
+        # Cheap once the shared exchange context is up; cold only for the very first lobby
+        await self.exchange.start()
+        await self.exchange.order_executor.warm_up()
+        print(f"🟢 [ROUNDS] Lobby {room.current_game.game_id} open for the next round")
+        return room
+
+    async def default_room(self, participant_uuid: Optional[str] = None) -> GameManager:
+        """
+        The room for reads that do not name one
+        The caller's own room when they pass their uuid, else the newest room that has
+        started or has players, so watchers stay on a running round while the next
+        lobby sits empty. Mutations do not use this: join() seats players in the oldest
+        room still filling and lobby_room() picks the room a forced start applies to.
+        """
+        room = self._player_room(participant_uuid) if participant_uuid else None
+        if room is not None:
+            return room
+        if self.read_only:
+            room = self.rooms.get(self.replica_default) if self.replica_default else None
+            if room is None:
+                # Nothing replicated yet: an empty room that reports "no game"
+                if self._placeholder is None:
+                    self._placeholder = GameManager(self.exchange)
+                room = self._placeholder
+            return room
+        async with self._lock:
+            room = self._watched_room() or self._first_open_room()
+            if room is None:
+                room = self._latest if self._latest is not None else await self.create_room()
+            return room
+
+    async def lobby_room(self) -> GameManager:
+        """
+        The room for mutations that do not name one, e.g. a forced start
+        The oldest room that has not started (opening one if none is left), never the
+        running round the watchers' default_room() prefers.
+        """
+        async with self._lock:
+            room = self._first_open_room() or next(
+                (
+                    room for room in self.rooms.values()
+                    if room.current_game and room.current_game.status == GameStatus.PREPARING
+                ),
+                None,
+            )
+            return room if room is not None else await self.create_room()
+
+    def default_room_id(self) -> Optional[str]:
+        """game_id of the room default_room() resolves to without a uuid, without opening one"""
+        room = self._watched_room() or self._first_open_room() or self._latest
+        return room.current_game.game_id if room and room.current_game else None
+
+    def _player_room(self, participant_uuid: str) -> Optional[GameManager]:
+        """The room a participant was seated in, while it is still kept"""
+        game_id = self._player_rooms.get(participant_uuid)
+        if game_id is not None:
+            return self.rooms.get(game_id)
+        if self.read_only:
+            # Seats are not replicated; look the player up in the mirrored rooms, newest first
+            for room in reversed(self.rooms.values()):
+                if room.current_game and participant_uuid in room.current_game.participants:
+                    return room
+        return None
+
+    def _watched_room(self) -> Optional[GameManager]:
+        """Newest room that has started or has players (rooms are kept in creation order)"""
+        # Only the open lobby can be empty and unstarted, so this stops within the newest two rooms
+        for room in reversed(self.rooms.values()):
+            game = room.current_game
+            if game is not None and (game.status != GameStatus.PREPARING or game.participants):
+                return room
+        return None
+
+    def replica(self, game_id: str) -> GameManager:
+        """The local mirror of one of the leader's rooms, created on first sight"""
+        room = self.rooms.get(game_id)
+        if room is None:
+            room = self.rooms[game_id] = GameManager(self.exchange)
+        return room
+
+    def drop_replicas(self, keep: Set[str]):
+        """Forget mirrored rooms the leader no longer has"""
+        for game_id in [game_id for game_id in self.rooms if game_id not in keep]:
+            self.rooms.pop(game_id).reset_game()
+
+    async def join(self, participant_uuid: str) -> Optional[Tuple[str, str]]:
+        """
+        Seat a participant in the first open room; returns (game_id, ball)
+        Returns None when the participant was queued for the next free room instead.
+        """
+        seat = self._current_seat(participant_uuid)
+        if seat is not None:
+            return seat
+
+        while True:
+            async with self._lock:
+                # Queued players go first; newcomers line up behind them
+                if self.queue:
+                    self.queue.enqueue(participant_uuid)
+                    return None
+                room = self._first_open_room()
+                if room is None:
+                    try:
+                        room = await self.create_room()
+                    except ValueError:
+                        self.queue.enqueue(participant_uuid)
+                        return None
+            try:
+                game_id, ball = await self.join_room(room, participant_uuid)
+            except ValueError:
+                if self._is_open(room):
+                    raise
+                continue  # The room filled or started while we were queued on it
+            return game_id, ball
+
+    async def join_room(self, room: GameManager, participant_uuid: str) -> Tuple[str, str]:
+        """Seat a participant in a specific room"""
+        ball = await room.join_game(participant_uuid)
+        game_id = room.current_game.game_id
+        self._player_rooms[participant_uuid] = game_id
+        if not self._is_open(room):
+            self._open_rooms.pop(game_id, None)
+        return game_id, ball
+
+    def queue_status(self, participant_uuid: str) -> Optional[Dict]:
+        """Where a participant stands: seated, or their place and estimated start in the queue"""
+        seat = self._current_seat(participant_uuid)
+        if seat is not None:
+            return {"status": "assigned", "game_id": seat[0], "ball": seat[1]}
+        ticket = self.queue.get(participant_uuid)
+        if ticket is None:
+            return None
+        ticket.touch()
+        position = self.queue.position(ticket)
+        return {
+            "status": "queued",
+            "position": position,
+            "queue_length": len(self.queue),
+            "estimated_start": self._estimate_start(position),
+        }
+
+    async def wait_for_admission(self, participant_uuid: str, timeout: float) -> Optional[Dict]:
+        """Long-poll: hold until a queued participant is seated or the timeout passes"""
+        ticket = self.queue.get(participant_uuid)
+        if ticket is not None:
+            ticket.touch()
+            try:
+                await asyncio.wait_for(ticket.assigned.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.queue_status(participant_uuid)
+
+    async def force_start(self, room: GameManager) -> Dict:
+        result = await room.force_start_game()
+        self._open_rooms.pop(room.current_game.game_id, None)
+        return result
+
+    def summary(self) -> List[Dict]:
+        return [
+            {
+                "game_id": game_id,
+                "status": room.current_game.status,
+                "participants_count": len(room.current_game.participants),
+            }
+            for game_id, room in self.rooms.items()
+            if room.current_game
+        ]
+
+    async def withdraw_orders(self):
+        """Stop every room's order execution and cancel its resting orders"""
+        results = await asyncio.gather(
+            *(room.withdraw_orders() for room in list(self.rooms.values())), return_exceptions=True
+        )
+        for error in results:
+            if error is not None:
+                print(f"⚠️ [ROOMS] Could not withdraw a round's orders: {type(error).__name__}: {error}")
+
+    async def reset(self):
+        """Drop every room and queued player (for testing), withdrawing their orders first"""
+        await self.withdraw_orders()
+        for room in self.rooms.values():
+            room.reset_game()
+        self.rooms.clear()
+        self._open_rooms.clear()
+        self._player_rooms.clear()
+        self._latest = None
+        self.queue.clear()
+        self._notify_round_change()
+
+    def _current_seat(self, participant_uuid: str) -> Optional[Tuple[str, str]]:
+        """(game_id, ball) of the participant's seat in a round that is not over yet"""
+        game_id = self._player_rooms.get(participant_uuid)
+        room = self.rooms.get(game_id) if game_id else None
+        if room is not None and room.current_game and room.current_game.status != GameStatus.DONE:
+            return game_id, room.current_game.participants[participant_uuid]
+        return None
+
+    def _live_room_count(self) -> int:
+        return sum(
+            1 for room in self.rooms.values()
+            if room.current_game and room.current_game.status != GameStatus.DONE
+        )
+
+    def _notify_round_change(self):
+        if self.on_round_change is not None:
+            self.on_round_change()
+
+    def _room_started(self, room: GameManager):
+        self._open_rooms.pop(room.current_game.game_id, None)
+        self._notify_round_change()
+
+    def _room_finished(self, room: GameManager):
+        """A round reached DONE: fold its length into the estimate and seat the queue"""
+        game = room.current_game
+        if game.start_time is not None and game.end_time is not None:
+            duration = (game.end_time - game.start_time).total_seconds()
+            self.round_seconds = 0.8 * self.round_seconds + 0.2 * duration
+        if self.queue and (self._admission_task is None or self._admission_task.done()):
+            self._admission_task = asyncio.create_task(self._admit_queued())
+        self._notify_round_change()
+
+    async def _admit_queued(self):
+        """Seat queued players 20 at a time, one new room per batch, while slots are free"""
+        while self.queue:
+            async with self._lock:
+                try:
+                    room = await self.create_room()
+                except ValueError:
+                    return  # No free slot; the next finished round resumes admission
+                batch = self.queue.take(20)
+            game_id = room.current_game.game_id
+            for ticket in batch:
+                try:
+                    await self.join_room(room, ticket.uuid)
+                except Exception as e:
+                    print(f"⚠️ [ROOMS] Could not seat queued player {ticket.uuid}: {e}")
+                ticket.assigned.set()
+            print(f"🎟️ [ROOMS] Admitted {len(batch)} queued players into {game_id} ({len(self.queue)} still waiting)")
+
+    def _estimate_start(self, position: int) -> float:
+        """Unix time a queued player at this position should be seated in a round"""
+        now = time.time()
+        # Expected finish of each live round, earliest first; each one frees a slot for 20 players
+        ends = sorted(
+            room.current_game.start_time.timestamp() + self.round_seconds
+            if room.current_game.start_time else now + self.round_seconds
+            for room in self.rooms.values()
+            if room.current_game and room.current_game.status != GameStatus.DONE
+        )
+        if not ends:
+            return now
+        wave, slot = divmod((position - 1) // 20, len(ends))
+        return max(now, ends[slot] + wave * self.round_seconds)
+
+    @staticmethod
+    def _is_open(room: GameManager) -> bool:
+        game = room.current_game
+        return game is not None and game.status == GameStatus.PREPARING and len(game.participants) < 20
+
+    def _first_open_room(self) -> Optional[GameManager]:
+        """Oldest room that still takes players; rooms that stopped filling are dropped from the index"""
+        for game_id in list(self._open_rooms):
+            room = self._open_rooms[game_id]
+            if self._is_open(room):
+                return room
+            del self._open_rooms[game_id]
+        return None
+
+    def retire_finished(self):
+        """Drop finished rooms past their retention period"""
+        now = time.time()
+        for game_id, room in list(self.rooms.items()):
+            game = room.current_game
+            if (
+                game is not None
+                and game.status == GameStatus.DONE
+                and game.end_time is not None
+                and now - game.end_time.timestamp() > self.room_retention
+            ):
+                for participant_uuid in game.participants:
+                    if self._player_rooms.get(participant_uuid) == game_id:
+                        del self._player_rooms[participant_uuid]
+                room.reset_game()
+                del self.rooms[game_id]
+                if self._latest is room:
+                    self._latest = None
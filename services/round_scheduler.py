@@ -0,0 +1,60 @@
+import asyncio
+import os
+from contextlib import suppress
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from services.room_registry import RoomRegistry
+
+
+class RoundScheduler:
+    """
+    Keeps rounds flowing back to back
+    Whenever no lobby is open (the last one filled and started drawing), the
+    next round's room is opened right away: balls generated, order context
+    warmed on the shared exchange connections. Players joining while round N is
+    still drawing fill round N+1, which starts the moment it is full. Finished
+    rounds are retired once their retention period is over.
+    """
+
+    def __init__(self, rooms: "RoomRegistry"):
+        self.rooms = rooms
+        self.enabled = os.getenv("ROUND_PIPELINE", "true").lower() == "true"
+        # Upper bound between sweeps; lobby fills and round ends wake the loop at once
+        self.sweep_interval = float(os.getenv("ROUND_SWEEP_INTERVAL", "5"))
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self.lobbies_opened = 0
+
+    def start(self):
+        """Start the scheduling loop if it is enabled and not running"""
+        if self.enabled and (self._task is None or self._task.done()):
+            self._running = True
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        # wait_for can swallow a cancel that races the wake event, so the loop also checks this flag
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    def wake(self):
+        """Re-check now: a lobby filled, a round finished or rooms were reset"""
+        self._wake.set()
+
+    async def _run(self):
+        print("🔁 [ROUNDS] Round scheduler started")
+        while self._running:
+            self._wake.clear()
+            try:
+                if await self.rooms.open_lobby() is not None:
+                    self.lobbies_opened += 1
+                self.rooms.retire_finished()
+            except Exception as e:
+                print(f"⚠️ [ROUNDS] Could not prepare the next round: {type(e).__name__}: {e}")
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self.sweep_interval)
@@ -0,0 +1,351 @@
+import asyncio
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+Value = Union[str, bytes, int, float]
+
+# Extend a lease's TTL only if it is still held by ARGV[1], as one atomic step
+RENEW_LEASE_SCRIPT = (
+    'if redis.call("GET", KEYS[1]) == ARGV[1] then '
+    'return redis.call("PEXPIRE", KEYS[1], ARGV[2]) '
+    "else return 0 end"
+)
+
+
+def _to_bytes(value: Value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+
+def _list_bounds(length: int, start: int, stop: int) -> Tuple[int, int]:
+    """Redis-style inclusive (start, stop) indexes, negatives from the end, as a slice"""
+    if start < 0:
+        start = max(0, length + start)
+    if stop < 0:
+        stop = length + stop
+    return start, min(stop, length - 1) + 1
+
+
+class StateBackend(ABC):
+    """
+    Store shared by the workers of one deployment
+    Provides the handful of key/value and list primitives the worker coordinator
+    needs (the Redis semantics of SET NX PX, GET, PEXPIRE, DEL, RPUSH, LTRIM,
+    LRANGE, BLPOP, and a compare-and-PEXPIRE for leases), plus the lease and log
+    helpers built on top of them.
+    """
+
+    # Whether other worker processes can see this store
+    shared = True
+
+    async def connect(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, value: Value, ttl_ms: Optional[int] = None, only_if_absent: bool = False) -> bool:
+        ...
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def expire(self, key: str, ttl_ms: int) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete(self, *keys: str):
+        ...
+
+    @abstractmethod
+    async def rpush(self, key: str, *values: Value):
+        ...
+
+    @abstractmethod
+    async def ltrim(self, key: str, start: int, stop: int):
+        ...
+
+    @abstractmethod
+    async def lrange(self, key: str, start: int, stop: int) -> List[bytes]:
+        ...
+
+    @abstractmethod
+    async def blpop(self, key: str, timeout: float) -> Optional[bytes]:
+        """Pop the head of a list, waiting up to timeout seconds for one to arrive"""
+        ...
+
+    @abstractmethod
+    async def renew_lease(self, key: str, owner: str, ttl_ms: int) -> bool:
+        """Reset the TTL of a lease owner holds, atomically; False if it is not theirs"""
+        ...
+
+    async def acquire_lease(self, key: str, owner: str, ttl_ms: int) -> bool:
+        """Take the lease if it is free, or extend it if owner already holds it"""
+        if await self.set(key, owner, ttl_ms, only_if_absent=True):
+            return True
+        return await self.renew_lease(key, owner, ttl_ms)
+
+    async def append(self, key: str, values: List[bytes], max_len: int):
+        """Append to a list capped at its newest max_len entries"""
+        if values:
+            await self.rpush(key, *values)
+            await self.ltrim(key, -max_len, -1)
+
+    async def tail(self, key: str, count: int) -> List[bytes]:
+        """The newest count entries of a list, oldest first"""
+        if count <= 0:
+            return []
+        return await self.lrange(key, -count, -1)
+
+
+class InProcessBackend(StateBackend):
+    """
+    State kept in this process's memory
+    The default for a single worker: it always wins the election and nothing is
+    replicated. Also the store behind state_standin.py.
+    """
+
+    def __init__(self, shared: bool = False):
+        self.shared = shared
+        self._values: Dict[str, Tuple[bytes, Optional[float]]] = {}  # key -> (value, monotonic expiry)
+        self._lists: Dict[str, Deque[bytes]] = {}
+        self._pushed = asyncio.Condition()
+
+    def _live_value(self, key: str) -> Optional[bytes]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self._values[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: Value, ttl_ms: Optional[int] = None, only_if_absent: bool = False) -> bool:
+        if only_if_absent and (self._live_value(key) is not None or key in self._lists):
+            return False
+        self._lists.pop(key, None)
+        expires_at = time.monotonic() + ttl_ms / 1000 if ttl_ms else None
+        self._values[key] = (_to_bytes(value), expires_at)
+        return True
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._live_value(key)
+
+    async def expire(self, key: str, ttl_ms: int) -> bool:
+        value = self._live_value(key)
+        if value is None:
+            return False
+        self._values[key] = (value, time.monotonic() + ttl_ms / 1000)
+        return True
+
+    async def renew_lease(self, key: str, owner: str, ttl_ms: int) -> bool:
+        if self._live_value(key) != _to_bytes(owner):
+            return False
+        return await self.expire(key, ttl_ms)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._values.pop(key, None)
+            self._lists.pop(key, None)
+
+    async def rpush(self, key: str, *values: Value):
+        self._values.pop(key, None)
+        self._lists.setdefault(key, deque()).extend(_to_bytes(value) for value in values)
+        async with self._pushed:
+            self._pushed.notify_all()
+
+    async def ltrim(self, key: str, start: int, stop: int):
+        items = self._lists.get(key)
+        if items is None:
+            return
+        begin, end = _list_bounds(len(items), start, stop)
+        kept = list(items)[begin:end]
+        if kept:
+            self._lists[key] = deque(kept)
+        else:
+            del self._lists[key]
+
+    async def lrange(self, key: str, start: int, stop: int) -> List[bytes]:
+        items = self._lists.get(key)
+        if not items:
+            return []
+        begin, end = _list_bounds(len(items), start, stop)
+        return list(items)[begin:end]
+
+    async def blpop(self, key: str, timeout: float) -> Optional[bytes]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        async with self._pushed:
+            while not self._lists.get(key):
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return None
+                try:
+                    await asyncio.wait_for(self._pushed.wait(), remaining)
+                except asyncio.TimeoutError:
+                    return None
+            items = self._lists[key]
+            value = items.popleft()
+            if not items:
+                del self._lists[key]
+            return value
+
+
+class _RespConnection:
+    """One Redis-protocol (RESP2) connection"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    async def call(self, *args: Value):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = _to_bytes(arg)
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self.writer.write(b"".join(parts))
+        await self.writer.drain()
+        return await self._read_reply()
+
+    async def _read_reply(self):
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("State store closed the connection")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RuntimeError(f"State store error: {body.decode()}")
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length < 0:
+                return None
+            data = await self.reader.readexactly(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            count = int(body)
+            if count < 0:
+                return None
+            return [await self._read_reply() for _ in range(count)]
+        raise RuntimeError(f"Unexpected state store reply: {line!r}")
+
+    def close(self):
+        self.writer.close()
+
+
+class RedisBackend(StateBackend):
+    """
+    State in a Redis-protocol server (redis://[:password@]host:port/db)
+    Speaks RESP2 directly over asyncio streams and only uses plain commands plus
+    the lease-renewal script, so Redis, Valkey, KeyDB or the bundled
+    state_standin.py can all serve it.
+    Blocking pops get a dedicated connection per list.
+    """
+
+    def __init__(self, url: Optional[str] = None):
+        self.url = url or os.getenv("STATE_REDIS_URL", "redis://127.0.0.1:6379/0")
+        parsed = urlparse(self.url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self._conn: Optional[_RespConnection] = None
+        self._lock = asyncio.Lock()  # One request in flight on the shared connection
+        self._blocking: Dict[str, _RespConnection] = {}
+
+    async def _open(self) -> _RespConnection:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        conn = _RespConnection(reader, writer)
+        if self.password:
+            await conn.call("AUTH", self.password)
+        if self.db:
+            await conn.call("SELECT", self.db)
+        return conn
+
+    async def connect(self):
+        if self._conn is None:
+            self._conn = await self._open()
+
+    async def close(self):
+        for conn in [self._conn, *self._blocking.values()]:
+            if conn is not None:
+                conn.close()
+        self._conn = None
+        self._blocking.clear()
+
+    async def _call(self, *args: Value):
+        async with self._lock:
+            for attempt in range(2):
+                if self._conn is None:
+                    self._conn = await self._open()
+                try:
+                    return await self._conn.call(*args)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    self._conn.close()
+                    self._conn = None
+                    if attempt:
+                        raise
+
+    async def set(self, key: str, value: Value, ttl_ms: Optional[int] = None, only_if_absent: bool = False) -> bool:
+        args = ["SET", key, value]
+        if ttl_ms:
+            args += ["PX", int(ttl_ms)]
+        if only_if_absent:
+            args.append("NX")
+        return await self._call(*args) == "OK"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._call("GET", key)
+
+    async def expire(self, key: str, ttl_ms: int) -> bool:
+        return await self._call("PEXPIRE", key, int(ttl_ms)) == 1
+
+    async def renew_lease(self, key: str, owner: str, ttl_ms: int) -> bool:
+        return await self._call("EVAL", RENEW_LEASE_SCRIPT, 1, key, owner, int(ttl_ms)) == 1
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self._call("DEL", *keys)
+
+    async def rpush(self, key: str, *values: Value):
+        await self._call("RPUSH", key, *values)
+
+    async def ltrim(self, key: str, start: int, stop: int):
+        await self._call("LTRIM", key, start, stop)
+
+    async def lrange(self, key: str, start: int, stop: int) -> List[bytes]:
+        return await self._call("LRANGE", key, start, stop)
+
+    async def blpop(self, key: str, timeout: float) -> Optional[bytes]:
+        conn = self._blocking.get(key)
+        if conn is None:
+            conn = self._blocking[key] = await self._open()
+        try:
+            reply = await conn.call("BLPOP", key, timeout)
+        except BaseException:
+            # A cancelled or failed blocking read leaves the reply unread; drop the connection
+            conn.close()
+            self._blocking.pop(key, None)
+            raise
+        return reply[1] if reply else None
+
+
+def create_state_backend(kind: Optional[str] = None) -> StateBackend:
+    """Backend named by STATE_BACKEND: "memory" (default, single worker) or "redis" """
+    kind = (kind or os.getenv("STATE_BACKEND", "memory")).lower()
+    if kind == "memory":
+        return InProcessBackend()
+    if kind == "redis":
+        return RedisBackend()
+    raise ValueError(f"Unknown state backend: {kind}")
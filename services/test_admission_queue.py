@@ -0,0 +1,49 @@
+import time
+
+import pytest
+
+from services.admission_queue import AdmissionQueue
+
+
+def test_tickets_keep_their_place_in_line():
+    queue = AdmissionQueue()
+    first = queue.enqueue("alice")
+    second = queue.enqueue("bob")
+
+    assert queue.enqueue("alice") is first
+    assert len(queue) == 2
+    assert queue.position(first) == 1
+    assert queue.position(second) == 2
+
+    assert [ticket.uuid for ticket in queue.take(1)] == ["alice"]
+    assert first.assigned.is_set() is False
+    assert queue.position(second) == 1
+    assert queue.get("alice") is None
+
+
+def test_take_drops_expired_tickets_and_wakes_them():
+    queue = AdmissionQueue(ticket_ttl=60)
+    stale = queue.enqueue("ghost")
+    stale.last_seen = time.monotonic() - 120
+    queue.enqueue("alice")
+    queue.enqueue("bob")
+
+    batch = queue.take(20)
+    assert [ticket.uuid for ticket in batch] == ["alice", "bob"]
+    assert stale.assigned.is_set()
+    assert len(queue) == 0
+
+
+def test_full_queue_rejects_newcomers():
+    queue = AdmissionQueue(max_size=1)
+    queue.enqueue("alice")
+    with pytest.raises(ValueError):
+        queue.enqueue("bob")
+
+
+def test_clear_wakes_every_waiter():
+    queue = AdmissionQueue()
+    tickets = [queue.enqueue(name) for name in ("alice", "bob")]
+    queue.clear()
+    assert len(queue) == 0
+    assert all(ticket.assigned.is_set() for ticket in tickets)
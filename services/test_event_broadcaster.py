@@ -0,0 +1,23 @@
+import asyncio
+import logging
+
+import pytest
+
+pytest.importorskip("msgpack")
+
+from services.event_broadcaster import EventBroadcaster, GameEvent  # noqa: E402
+
+
+def test_slow_subscriber_is_dropped_and_logged_with_its_queue_depth(caplog):
+    async def scenario():
+        broadcaster = EventBroadcaster(max_queue=2)
+        slow = broadcaster.subscribe()
+        with caplog.at_level(logging.WARNING, logger="services.event_broadcaster"):
+            for i in range(3):
+                broadcaster.publish(GameEvent("price", {"price": 60000.0 + i}))
+        assert not broadcaster.has_subscribers
+        assert await slow.get() is None
+
+    asyncio.run(scenario())
+    [record] = caplog.records
+    assert record.getMessage().startswith("⚠️ [STREAM] Dropping slow subscriber with 2 events queued")
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+for module in ("dotenv", "msgpack", "pydantic", "aiohttp", "websockets", "eth_account", "async_hyper"):
+    pytest.importorskip(module)
+
+from models.game import GameStatus  # noqa: E402
+from services.game_manager import GameManager  # noqa: E402
+from services.order_executor import SignedCancel  # noqa: E402
+
+
+class FakeExecutor:
+    """Order executor double that rests every order and records what it sends"""
+
+    def __init__(self, trace):
+        self.trace = trace
+        self.sent_cancels = []
+
+    async def warm_up(self):
+        pass
+
+    async def place_orders(self, balls, prepared, tolerance, registry):
+        order_ids = []
+        for i, ball in enumerate(balls):
+            registry.register(ball, 0.001)
+            order = registry.record_status(ball.ball_name, {"resting": {"oid": 100 + i}})
+            order_ids.append(order.oid)
+        self.trace.append("placed")
+        return order_ids
+
+    async def prepare_cancels(self, order_ids):
+        return {
+            oid: SignedCancel([other for other in order_ids if other != oid], {"type": "cancel"}, i, None)
+            for i, oid in enumerate(order_ids)
+        }
+
+    async def send_cancel(self, signed, registry=None):
+        self.trace.append("cancel_sent")
+        self.sent_cancels.append(signed)
+        await asyncio.sleep(0)
+        return True
+
+    async def cancel_orders(self, order_ids, registry=None):
+        self.trace.append("cancel_signed_and_sent")
+        return True
+
+
+class FakeFills:
+    def __init__(self):
+        self.queue = asyncio.Queue()
+
+    def listen(self):
+        return self.queue
+
+    def remove_listener(self, queue):
+        pass
+
+
+class FakeExchange:
+    price_max_age = 1.0
+
+    def __init__(self, trace):
+        self.order_executor = FakeExecutor(trace)
+        self.fill_client = FakeFills()
+        self.price_service = None
+
+    async def start(self):
+        pass
+
+
+def test_first_fill_sends_the_presigned_cancel_before_the_state_changes():
+    async def scenario():
+        trace = []
+        exchange = FakeExchange(trace)
+        manager = GameManager(exchange)
+        await manager.create_new_game()
+        manager.current_game.status = GameStatus.DRAWING
+
+        mark_state_changed = manager._mark_state_changed
+
+        def traced_mark_state_changed(*args, **kwargs):
+            trace.append("state_change")
+            mark_state_changed(*args, **kwargs)
+
+        manager._mark_state_changed = traced_mark_state_changed
+
+        execution = asyncio.create_task(manager.execute_orders())
+        while "placed" not in trace:
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.01)  # Let the cancels be pre-signed
+
+        winner = manager.current_game.orders.get("100").ball.ball_name
+        trace.append("fill")
+        await exchange.fill_client.queue.put(SimpleNamespace(oid="100", sz=0.001, received_at=time.monotonic()))
+        await execution
+        await manager._cancel_task
+        return manager, exchange, trace, winner
+
+    manager, exchange, trace, winner = asyncio.run(scenario())
+    after_fill = trace[trace.index("fill") + 1:]
+    assert after_fill[0] == "cancel_sent"
+    assert "state_change" in after_fill
+    assert manager.current_game.status == GameStatus.DONE
+    assert manager.current_game.winner == winner
+    assert manager.current_game.filled_order == "100"
+    [cancel] = exchange.order_executor.sent_cancels
+    assert "100" not in cancel.order_ids
+    assert len(cancel.order_ids) == len(manager.current_game.balls) - 1
+
+
+def test_status_event_encodings_show_the_state_it_was_published_with():
+    import json
+
+    import msgpack
+
+    async def scenario():
+        manager = GameManager(FakeExchange([]))
+        await manager.create_new_game()
+        event = manager.get_status_event()
+        manager.current_game.winner = "B0"
+        manager._mark_state_changed()
+        return event
+
+    event = asyncio.run(scenario())
+    as_json = json.loads(event.json)["data"]
+    as_msgpack = msgpack.unpackb(event.msgpack)["data"]
+    assert as_json["version"] == as_msgpack["version"]
+    assert as_json["winner"] == as_msgpack["winner"] == ""
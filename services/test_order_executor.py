@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+
+for module in ("pydantic", "async_hyper", "eth_account"):
+    pytest.importorskip(module)
+
+from models.ball import BallAssignment, BallType  # noqa: E402
+from models.order import OrderRegistry, OrderState  # noqa: E402
+from services.order_executor import (  # noqa: E402
+    OrderExecutor,
+    PreparedOrder,
+    PreparedOrderBatch,
+    SignedOrderAction,
+)
+from services.request_scheduler import RequestScheduler  # noqa: E402
+
+
+class FakeSigner:
+    async def sign(self, action, nonce):
+        return "signature"
+
+    async def sign_all(self, items):
+        return ["signature"] * len(items)
+
+
+class FakeExchange:
+    """Exchange double: answers each posted action with handler(action), which may raise"""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.posted = []
+
+    async def post_action_with_sig(self, action, signature, nonce):
+        self.posted.append(action)
+        return self.handler(action)
+
+
+class FakeInfo:
+    """Info endpoint double answering orderStatus lookups from a cloid -> reply map"""
+
+    def __init__(self, replies):
+        self.replies = replies
+        self.lookups = []
+
+    async def __call__(self, request):
+        assert request["type"] == "orderStatus"
+        self.lookups.append(request["oid"])
+        reply = self.replies[request["oid"]]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+class FakeHyper:
+    account = None
+    is_mainnet = False
+
+    def __init__(self, exchange):
+        self.exchange = exchange
+
+
+def statuses(*entries):
+    return {"status": "ok", "response": {"type": "order", "data": {"statuses": list(entries)}}}
+
+
+def found(state, oid):
+    return {"status": "order", "order": {"status": state, "order": {"oid": oid, "origSz": "0.001"}}}
+
+
+def batch(names):
+    orders = []
+    for i, name in enumerate(names):
+        ball = BallAssignment(ball_name=name, target_price=0.0, uuid="", position=BallType.LONG)
+        cloid = f"0x{i:032x}"
+        encoded = {"a": 0, "b": True, "p": "60000", "s": "0.001", "r": False, "t": {"limit": {"tif": "Alo"}}, "c": cloid}
+        orders.append(PreparedOrder(ball, 60000.0 - i, cloid, encoded))
+    action = {"type": "order", "orders": [order.encoded for order in orders], "grouping": "na"}
+    return PreparedOrderBatch(60000.0, orders, [SignedOrderAction(orders, action, 1, "signature")])
+
+
+def run(handler, info_replies, names):
+    async def scenario():
+        exchange = FakeExchange(handler)
+        info = FakeInfo(info_replies)
+        scheduler = RequestScheduler()
+        executor = OrderExecutor(
+            FakeHyper(exchange), None, scheduler=scheduler, signer=FakeSigner(), info=info, user="0xuser"
+        )
+        prepared = batch(names)
+        registry = OrderRegistry()
+        try:
+            placed = await executor.execute_prepared(prepared, registry)
+        finally:
+            await scheduler.close()
+        return placed, registry, exchange, info, prepared
+
+    return asyncio.run(scenario())
+
+
+def test_bulk_response_with_mixed_statuses():
+    response = statuses(
+        {"resting": {"oid": 1}},
+        {"filled": {"oid": 2, "totalSz": "0.001", "avgPx": "59999"}},
+        {"error": "Post only order would have immediately matched"},
+    )
+    placed, registry, exchange, info, _ = run(lambda action: response, {}, ["B0", "B1", "B2"])
+
+    assert placed == ["1", "2"]
+    assert registry.for_ball("B0").state == OrderState.RESTING
+    assert registry.for_ball("B1").state == OrderState.FILLED
+    assert registry.for_ball("B2").state == OrderState.REJECTED
+    assert registry.for_ball("B2").error.startswith("Post only")
+    # Rejected orders are not re-sent and nothing is looked up
+    assert len(exchange.posted) == 1
+    assert info.lookups == []
+
+
+def test_failed_bulk_request_is_settled_by_cloid_lookup():
+    def handler(action):
+        if len(action["orders"]) > 1:
+            raise asyncio.TimeoutError()
+        return statuses({"resting": {"oid": 10}})
+
+    info_replies = {
+        "0x" + "0" * 32: {"status": "unknownOid"},
+        f"0x{1:032x}": found("open", 11),
+        f"0x{2:032x}": found("filled", 12),
+    }
+    placed, registry, exchange, info, prepared = run(handler, info_replies, ["B0", "B1", "B2"])
+
+    assert sorted(info.lookups) == sorted(info_replies)
+    # Only the order the exchange never saw is re-sent, with its original cloid
+    assert len(exchange.posted) == 2
+    assert exchange.posted[1]["orders"] == [prepared.orders[0].encoded]
+    assert placed == ["10", "11", "12"]
+    assert registry.for_ball("B0").state == OrderState.RESTING
+    assert registry.for_ball("B1").state == OrderState.RESTING
+    assert registry.for_ball("B2").state == OrderState.FILLED
+
+
+def test_orders_whose_lookup_fails_are_not_re_sent():
+    def handler(action):
+        raise ConnectionResetError("connection reset")
+
+    info_replies = {"0x" + "0" * 32: asyncio.TimeoutError()}
+    placed, registry, exchange, info, _ = run(handler, info_replies, ["S0"])
+
+    assert placed == []
+    assert len(exchange.posted) == 1
+    assert registry.for_ball("S0").state == OrderState.REJECTED
+    assert registry.for_ball("S0").error.startswith("Status unknown")
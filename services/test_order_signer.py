@@ -0,0 +1,38 @@
+import asyncio
+import threading
+
+import pytest
+
+for module in ("async_hyper", "eth_account"):
+    pytest.importorskip(module)
+
+from services import order_signer  # noqa: E402
+from services.order_signer import OrderSigner  # noqa: E402
+
+
+def test_urgent_signing_does_not_queue_behind_a_busy_pool(monkeypatch):
+    release = threading.Event()
+
+    def fake_sign_action(account, action, vault, nonce, is_mainnet):
+        if action["type"] == "order":
+            release.wait(5)
+        return f"{action['type']}-{nonce}"
+
+    monkeypatch.setattr(order_signer, "sign_action", fake_sign_action)
+
+    async def scenario():
+        signer = OrderSigner(account=None, is_mainnet=False, mode="thread", workers=1)
+        try:
+            refresh = asyncio.ensure_future(signer.sign_all([({"type": "order"}, n) for n in range(4)]))
+            await asyncio.sleep(0.05)
+            cancel = await asyncio.wait_for(signer.sign({"type": "cancel"}, 9, urgent=True), 1)
+            assert not refresh.done()
+            release.set()
+            return cancel, await refresh
+        finally:
+            release.set()
+            signer.close()
+
+    cancel, refresh = asyncio.run(scenario())
+    assert cancel == "cancel-9"
+    assert refresh == [f"order-{n}" for n in range(4)]
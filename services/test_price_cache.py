@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from services.price_cache import PriceCache
+
+
+class SlowSource:
+    """Price source whose fetches take `delay` seconds and return increasing prices"""
+
+    def __init__(self, delay: float = 0.01, fail: bool = False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def fetch(self) -> float:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("exchange unavailable")
+        return 60000.0 + self.calls
+
+
+def test_concurrent_misses_share_one_fetch():
+    async def scenario():
+        source = SlowSource()
+        cache = PriceCache(source.fetch)
+        prices = await asyncio.gather(*(cache.get(1.0) for _ in range(10)))
+        return source, cache, prices
+
+    source, cache, prices = asyncio.run(scenario())
+    assert prices == [60001.0] * 10
+    assert source.calls == cache.fetches == 1
+
+
+def test_fresh_price_is_served_from_memory():
+    async def scenario():
+        source = SlowSource()
+        cache = PriceCache(source.fetch)
+        first = await cache.get(1.0)
+        again = await cache.get(1.0)
+        await asyncio.sleep(0.02)
+        refreshed = await cache.get(0.01)
+        return source, first, again, refreshed
+
+    source, first, again, refreshed = asyncio.run(scenario())
+    assert first == again == 60001.0
+    assert refreshed == 60002.0
+    assert source.calls == 2
+
+
+def test_pushed_price_counts_as_fresh():
+    async def scenario():
+        source = SlowSource()
+        cache = PriceCache(source.fetch)
+        cache.put(61000.0)
+        return source, await cache.get(1.0)
+
+    source, price = asyncio.run(scenario())
+    assert price == 61000.0
+    assert source.calls == 0
+
+
+def test_prefetch_fills_the_cache_in_the_background():
+    async def scenario():
+        source = SlowSource()
+        cache = PriceCache(source.fetch)
+        cache.prefetch(1.0)
+        cache.prefetch(1.0)  # Joins the fetch already in flight
+        price = await cache.get(1.0)
+        cache.prefetch(1.0)  # Fresh enough, nothing to do
+        return source, price
+
+    source, price = asyncio.run(scenario())
+    assert price == 60001.0
+    assert source.calls == 1
+
+
+def test_failed_fetch_reaches_every_waiter_and_is_retried():
+    async def scenario():
+        source = SlowSource(fail=True)
+        cache = PriceCache(source.fetch)
+        results = await asyncio.gather(cache.get(), cache.get(), return_exceptions=True)
+        cache.prefetch()  # A failed background refresh is not reported as unhandled
+        await asyncio.sleep(0.02)
+        source.fail = False
+        return source, results, await cache.get()
+
+    source, results, price = asyncio.run(scenario())
+    assert all(isinstance(result, ConnectionError) for result in results)
+    assert price == 60003.0
+    assert source.calls == 3
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_fetch():
+    async def scenario():
+        source = SlowSource(delay=0.05)
+        cache = PriceCache(source.fetch)
+        impatient = asyncio.ensure_future(cache.get())
+        patient = asyncio.ensure_future(cache.get())
+        await asyncio.sleep(0.01)
+        impatient.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await impatient
+        return source, await patient
+
+    source, price = asyncio.run(scenario())
+    assert price == 60001.0
+    assert source.calls == 1
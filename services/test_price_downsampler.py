@@ -0,0 +1,46 @@
+from models.price_history import PriceHistory
+from services.price_downsampler import OHLCSeries, PriceDownsampler
+
+
+def test_bars_aggregate_ticks_per_bucket():
+    history = PriceHistory(10)
+    for timestamp, price in [(10.0, 100.0), (10.4, 103.0), (10.8, 99.0), (11.2, 101.0)]:
+        history.append(timestamp, price)
+
+    series = OHLCSeries(1)
+    series.update(history)
+    assert series.to_list() == [
+        {"timestamp": 10.0, "open": 100.0, "high": 103.0, "low": 99.0, "close": 99.0},
+        {"timestamp": 11.0, "open": 101.0, "high": 101.0, "low": 101.0, "close": 101.0},
+    ]
+
+
+def test_max_points_bounds_the_bars_after_wraparound():
+    history = PriceHistory(100)
+    downsampler = PriceDownsampler()
+    for i in range(1000):
+        history.append(1000.0 + i * 0.1, 50000.0 + i)
+        if i % 10 == 9:
+            _, bars = downsampler.get_bars(history, max_points=10)
+            assert len(bars) <= 10
+
+    step, bars = downsampler.get_bars(history, max_points=10)
+    first, _ = history.time_bounds()
+    assert step == PriceDownsampler.resolution_for_points(history, 10)
+    assert len(bars) <= 10
+    assert bars[0]["timestamp"] <= first < bars[0]["timestamp"] + step
+    assert bars[-1]["close"] == history.last_price()
+
+
+def test_explicit_resolution_keeps_only_the_retained_window():
+    history = PriceHistory(50)
+    downsampler = PriceDownsampler()
+    for i in range(500):
+        history.append(float(i), 100.0 + i)
+        downsampler.get_bars(history, resolution=1)
+
+    step, bars = downsampler.get_bars(history, resolution=1)
+    assert step == 1
+    assert len(bars) == 50
+    assert bars[0] == {"timestamp": 450.0, "open": 550.0, "high": 550.0, "low": 550.0, "close": 550.0}
+
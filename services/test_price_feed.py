@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import pytest
+
+websockets = pytest.importorskip("websockets")
+
+from services.price_feed import StreamingPriceFeed  # noqa: E402
+from services.request_scheduler import RequestScheduler  # noqa: E402
+
+
+def mids_frame(price: float) -> str:
+    return json.dumps({"channel": "allMids", "data": {"mids": {"BTC": str(price), "ETH": "3000.0"}}})
+
+
+class StandInServer:
+    """Local allMids server; each connection is served the next script of prices"""
+
+    def __init__(self, scripts, close_after_script: bool = False):
+        self.scripts = list(scripts)
+        self.close_after_script = close_after_script
+        self.connections = 0
+        self.subscriptions = []
+
+    async def handler(self, ws):
+        self.connections += 1
+        self.subscriptions.append(json.loads(await ws.recv()))
+        prices = self.scripts.pop(0) if self.scripts else []
+        for price in prices:
+            await ws.send(mids_frame(price))
+        if not self.close_after_script:
+            await ws.wait_closed()
+
+
+async def wait_until(condition, timeout: float = 5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+class RestStandIn:
+    """Exchange client double that answers REST price reads"""
+
+    def __init__(self, price: float):
+        self.price = price
+        self.calls = 0
+
+    async def get_market_price(self, coin: str) -> float:
+        self.calls += 1
+        return self.price
+
+
+def test_feed_keeps_the_latest_streamed_price():
+    async def scenario():
+        server = StandInServer([[60000.0, 60001.5]])
+        async with websockets.serve(server.handler, "127.0.0.1", 0) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            pushed = []
+            feed = StreamingPriceFeed(f"ws://127.0.0.1:{port}", on_price=pushed.append)
+            feed.start()
+            try:
+                await wait_until(lambda: feed.latest_price == 60001.5)
+            finally:
+                await feed.stop()
+
+        assert server.subscriptions == [{"method": "subscribe", "subscription": {"type": "allMids"}}]
+        assert pushed == [60000.0, 60001.5]
+        assert feed.is_fresh
+
+    asyncio.run(scenario())
+
+
+def test_feed_reconnects_after_the_connection_drops():
+    async def scenario():
+        server = StandInServer([[60000.0], [60100.0]], close_after_script=True)
+        async with websockets.serve(server.handler, "127.0.0.1", 0) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            feed = StreamingPriceFeed(f"ws://127.0.0.1:{port}")
+            feed.start()
+            try:
+                await wait_until(lambda: feed.latest_price == 60100.0)
+            finally:
+                await feed.stop()
+
+        assert server.connections >= 2
+        assert feed.reconnects >= 1
+
+    asyncio.run(scenario())
+
+
+def test_reads_fall_back_to_rest_when_the_stream_goes_stale():
+    pytest.importorskip("async_hyper")
+    from services.price_service import PriceService
+
+    async def scenario():
+        server = StandInServer([[60000.0]])
+        async with websockets.serve(server.handler, "127.0.0.1", 0) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            feed = StreamingPriceFeed(f"ws://127.0.0.1:{port}", stale_after=0.2)
+            rest = RestStandIn(59000.0)
+            scheduler = RequestScheduler()
+            prices = PriceService(rest, feed, max_age=0.0, scheduler=scheduler)
+            feed.start()
+            try:
+                await wait_until(lambda: feed.latest_price is not None)
+                assert await prices.get_current_price() == 60000.0
+                assert rest.calls == 0
+
+                await wait_until(lambda: not feed.is_fresh)
+                assert await prices.get_current_price() == 59000.0
+                assert rest.calls == 1
+            finally:
+                await feed.stop()
+                await scheduler.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from services.state_backend import InProcessBackend, StateBackend, create_state_backend
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_set_get_expire_and_delete():
+    async def scenario():
+        store = InProcessBackend()
+        assert await store.set("a", "1")
+        assert not await store.set("a", "2", only_if_absent=True)
+        assert await store.get("a") == b"1"
+        assert await store.set("b", 2, ttl_ms=20)
+        await asyncio.sleep(0.03)
+        assert await store.get("b") is None
+        assert not await store.expire("b", 1000)
+        await store.delete("a", "missing")
+        assert await store.get("a") is None
+
+    run(scenario())
+
+
+def test_lease_is_held_by_one_owner_until_it_expires():
+    async def scenario():
+        store = InProcessBackend()
+        assert await store.acquire_lease("leader", "w1", 50)
+        assert not await store.acquire_lease("leader", "w2", 50)
+        assert await store.acquire_lease("leader", "w1", 50)  # Renewed by its holder
+        assert not await store.renew_lease("leader", "w2", 50)
+
+        await asyncio.sleep(0.06)
+        assert await store.acquire_lease("leader", "w2", 50)
+        assert not await store.renew_lease("leader", "w1", 50)
+        assert await store.get("leader") == b"w2"
+
+    run(scenario())
+
+
+def test_append_caps_the_list_and_tail_reads_the_newest():
+    async def scenario():
+        store = InProcessBackend()
+        await store.append("ticks", [b"1", b"2", b"3"], max_len=4)
+        await store.append("ticks", [b"4", b"5"], max_len=4)
+        await store.append("ticks", [], max_len=4)
+        return (
+            await store.lrange("ticks", 0, -1),
+            await store.tail("ticks", 2),
+            await store.tail("ticks", 10),
+            await store.tail("ticks", 0),
+        )
+
+    everything, newest, capped, nothing = run(scenario())
+    assert everything == [b"2", b"3", b"4", b"5"]
+    assert newest == [b"4", b"5"]
+    assert capped == everything
+    assert nothing == []
+
+
+def test_blpop_waits_for_a_push():
+    async def scenario():
+        store = InProcessBackend()
+        assert await store.blpop("commands", 0.01) is None
+        waiter = asyncio.ensure_future(store.blpop("commands", 1.0))
+        await asyncio.sleep(0.01)
+        await store.rpush("commands", "first", "second")
+        first = await waiter
+        second = await store.blpop("commands", 0.01)
+        return first, second, await store.lrange("commands", 0, -1)
+
+    assert run(scenario()) == (b"first", b"second", [])
+
+
+def test_backends_must_implement_every_primitive():
+    with pytest.raises(TypeError):
+        StateBackend()
+
+    assert not create_state_backend("memory").shared
+    with pytest.raises(ValueError):
+        create_state_backend("sqlite")
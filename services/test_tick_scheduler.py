@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from services.tick_scheduler import TickScheduler
+
+
+def test_ticks_stay_on_the_interval_grid():
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        fired = []
+
+        async def tick():
+            fired.append(loop.time())
+
+        scheduler = TickScheduler(0.02, tick)
+        start = loop.time()
+        await scheduler.run(lambda: len(fired) < 5)
+        return start, fired, scheduler
+
+    start, fired, scheduler = asyncio.run(scenario())
+    assert scheduler.ticks == 5
+    assert scheduler.missed_ticks == 0
+    # The first tick is one interval in, and lateness does not accumulate as drift
+    assert fired[0] - start >= 0.02
+    assert fired[-1] - start == pytest.approx(5 * 0.02, abs=0.02)
+
+
+def test_overrunning_tick_skips_the_deadlines_it_covered():
+    async def scenario():
+        calls = 0
+
+        async def tick():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(0.075)  # Covers the next three deadlines
+
+        scheduler = TickScheduler(0.02, tick)
+        await scheduler.run(lambda: calls < 3)
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+    assert scheduler.ticks == 3
+    assert scheduler.missed_ticks == 3
+
+
+def test_interval_must_be_positive():
+    async def tick():
+        pass
+
+    with pytest.raises(ValueError):
+        TickScheduler(0, tick)
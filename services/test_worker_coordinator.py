@@ -0,0 +1,154 @@
+import asyncio
+from contextlib import suppress
+
+import pytest
+
+from services.state_backend import InProcessBackend, RedisBackend
+from services.worker_coordinator import WorkerCoordinator
+from state_standin import start_server
+
+
+class FakeRoom:
+    """Room double whose replicated state is just its player list"""
+
+    price_history_capacity = 16
+    current_game = None
+
+    def __init__(self):
+        self.players = []
+        self.state_version = 0
+
+    def export_replica(self):
+        return {"version": self.state_version, "cursor": 0, "game": None, "players": list(self.players)}
+
+    def apply_replica(self, state, ticks):
+        self.players = state["players"]
+        self.state_version = state["version"]
+
+
+class FakeRooms:
+    """Room registry double: the leader opens one room on startup"""
+
+    def __init__(self, failed_startups: int = 0):
+        self.rooms = {}
+        self.queue = []
+        self.read_only = False
+        self.replica_default = None
+        self.startups = 0
+        self.failed_startups = failed_startups
+
+    async def startup(self):
+        if self.failed_startups:
+            self.failed_startups -= 1
+            raise ConnectionError("exchange unreachable")
+        self.startups += 1
+        self.rooms.setdefault("lobby", FakeRoom())
+
+    async def stand_down(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def default_room_id(self):
+        return next(iter(self.rooms), None)
+
+    def replica(self, game_id):
+        return self.rooms.setdefault(game_id, FakeRoom())
+
+    def drop_replicas(self, keep):
+        for game_id in [game_id for game_id in self.rooms if game_id not in keep]:
+            del self.rooms[game_id]
+
+
+def coordinator(backend, rooms):
+    worker = WorkerCoordinator(rooms, backend)
+    worker.prefix = "test"
+    worker.lease_ms = 300
+    worker.replication_interval = 0.02
+    worker.forward_timeout = 2.0
+
+    @worker.command("join")
+    async def join(participant_uuid):
+        room = rooms.rooms["lobby"]
+        room.players.append(participant_uuid)
+        room.state_version += 1
+        return 200, {"game_id": "lobby", "worker": worker.worker_id}
+
+    return worker
+
+
+async def wait_until(condition, timeout: float = 5.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+async def crash(worker):
+    """Stop a worker's tasks without handing its lease over, as if its process died"""
+    worker._running = False
+    for task in [worker._election_task, *worker._role_tasks]:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await worker.backend.close()
+
+
+def test_two_workers_elect_forward_replicate_and_take_over():
+    async def scenario():
+        server = await start_server("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        url = f"redis://127.0.0.1:{port}/0"
+        first_rooms, second_rooms = FakeRooms(), FakeRooms()
+        first = coordinator(RedisBackend(url), first_rooms)
+        second = coordinator(RedisBackend(url), second_rooms)
+        try:
+            await first.start()
+            await second.start()
+            assert first.role == "leader"
+            assert second.role == "follower"
+            assert second_rooms.read_only
+
+            # A join on the follower runs on the leader
+            status_code, body = await second.run("join", "player-1")
+            assert (status_code, body) == (200, {"game_id": "lobby", "worker": first.worker_id})
+            assert first_rooms.rooms["lobby"].players == ["player-1"]
+
+            # ...and its result is mirrored back to the follower
+            await wait_until(lambda: "lobby" in second_rooms.rooms and second_rooms.rooms["lobby"].players == ["player-1"])
+            assert second_rooms.replica_default == "lobby"
+            assert second.queued() == 0
+
+            # The leader dies holding the lease; the follower takes over once it expires
+            await crash(first)
+            await wait_until(lambda: second.role == "leader")
+            assert second_rooms.startups == 1
+            assert not second_rooms.read_only
+            assert await second.run("join", "player-2") == (200, {"game_id": "lobby", "worker": second.worker_id})
+        finally:
+            await second.stop()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(scenario())
+
+
+def test_role_is_leader_only_once_the_rooms_started():
+    async def scenario():
+        rooms = FakeRooms(failed_startups=1)
+        worker = coordinator(InProcessBackend(), rooms)
+        with pytest.raises(ConnectionError):
+            await worker.start()
+        assert worker.role == "follower"
+        assert not worker.is_leader
+        # The lease was given back, so the next election can take it again
+        assert await worker.backend.get(worker._key("leader")) is None
+
+        await worker._elect()
+        assert worker.role == "leader"
+        assert rooms.startups == 1
+        await worker.stop()
+
+    asyncio.run(scenario())
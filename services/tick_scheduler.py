@@ -0,0 +1,40 @@
+import asyncio
+from typing import Awaitable, Callable
+
+
+class TickScheduler:
+    """
+    Runs a coroutine callback at a fixed cadence on the event loop's monotonic clock
+    Deadlines are start + n * interval, so callback latency does not accumulate as drift.
+    Callbacks never overlap: when one overruns, the deadlines it covered are skipped and
+    counted in `missed_ticks` instead of being fired back to back.
+    """
+
+    def __init__(self, interval: float, callback: Callable[[], Awaitable[None]]):
+        if interval <= 0:
+            raise ValueError("Tick interval must be positive")
+        self.interval = interval
+        self.callback = callback
+        self.ticks = 0
+        self.missed_ticks = 0
+
+    async def run(self, should_continue: Callable[[], bool]):
+        """
+        Tick until should_continue() returns False (checked before every tick)
+        The first tick fires one interval after the call; the caller records time zero itself.
+        """
+        loop = asyncio.get_running_loop()
+        next_deadline = loop.time() + self.interval
+        while True:
+            await asyncio.sleep(next_deadline - loop.time())
+            if not should_continue():
+                break
+            await self.callback()
+            self.ticks += 1
+
+            next_deadline += self.interval
+            now = loop.time()
+            if now > next_deadline:
+                missed = int((now - next_deadline) // self.interval) + 1
+                self.missed_ticks += missed
+                next_deadline += missed * self.interval
@@ -0,0 +1,386 @@
+import asyncio
+import json
+import os
+import socket
+import struct
+import time
+import uuid
+from contextlib import suppress
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from services.state_backend import StateBackend, create_state_backend
+from utils.diagnostics import get_logger
+
+if TYPE_CHECKING:
+    from services.room_registry import RoomRegistry
+
+log = get_logger(__name__)
+
+# One replicated price tick: (cursor, timestamp, price)
+TICK = struct.Struct("<qdd")
+# Extra ticks fetched past the gap, in case the leader appended more after publishing the state
+TICK_SLACK = 64
+
+CommandResult = Tuple[int, Any]  # (HTTP status code, JSON body)
+
+
+class WorkerCoordinator:
+    """
+    One worker's part in a multi-worker deployment
+    Workers elect a leader through a lease in the shared state backend. The
+    leader runs the rounds (price loop, order execution) and publishes every
+    room's state; the other workers mirror it into read-only rooms, serve reads
+    (/status, streams) from those, and forward mutating commands (join, start,
+    reset) to the leader through a backend list. With the in-process backend
+    the single worker is always the leader and nothing is replicated.
+    """
+
+    def __init__(self, rooms: "RoomRegistry", backend: Optional[StateBackend] = None):
+        self.rooms = rooms
+        self.backend = backend or create_state_backend()
+        self.prefix = os.getenv("STATE_KEY_PREFIX", "omb")
+        self.lease_ms = int(os.getenv("LEADER_LEASE_MS", "3000"))
+        # How often the leader publishes changed rooms and followers pull them (seconds)
+        self.replication_interval = float(os.getenv("REPLICATION_INTERVAL", "0.1"))
+        self.forward_timeout = float(os.getenv("FORWARD_TIMEOUT", "10"))
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+        self.role: Optional[str] = None  # "leader" or "follower" once started
+        self.handlers: Dict[str, Callable[..., Awaitable[CommandResult]]] = {}
+        self._running = False
+        self._lease_until = 0.0  # time.monotonic() until which the held lease is known valid
+        self._election_task: Optional[asyncio.Task] = None
+        self._role_tasks: List[asyncio.Task] = []
+        self._command_tasks: Set[asyncio.Task] = set()
+        self._pending: Dict[str, asyncio.Future] = {}  # forwarded request id -> reply
+        self._published: Dict[str, Tuple[int, int]] = {}  # game_id -> (state version, price cursor) pushed
+        self._applied: Dict[str, int] = {}  # game_id -> state version mirrored
+        self._index: Dict = {}  # Last room index published (leader) or applied (follower)
+
+    @property
+    def is_leader(self) -> bool:
+        """Whether this worker runs the rounds (also true before start, as a standalone worker)"""
+        return self.role != "follower"
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix, *parts))
+
+    def command(self, name: str):
+        """Register the leader-side handler of a mutating command"""
+        def register(handler: Callable[..., Awaitable[CommandResult]]):
+            self.handlers[name] = handler
+            return handler
+        return register
+
+    async def start(self):
+        """Connect to the backend and take a role; the first election settles before serving"""
+        await self.backend.connect()
+        self._running = True
+        await self._elect()
+        self._election_task = asyncio.create_task(self._election_loop())
+
+    async def stop(self):
+        self._running = False
+        if self._election_task:
+            self._election_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._election_task
+            self._election_task = None
+        was_leader = self.role == "leader"
+        await self._stop_role_tasks()
+        await self.rooms.shutdown()
+        if was_leader:
+            # Hand over right away instead of letting the lease run out
+            await self._release_lease()
+        await self.backend.close()
+
+    async def run(self, command: str, *args, timeout: Optional[float] = None) -> CommandResult:
+        """Execute a mutating command on the leader: here if this worker leads, otherwise forwarded"""
+        if self.is_leader:
+            return await self._execute(command, list(args))
+        return await self._forward(command, list(args), timeout or self.forward_timeout)
+
+    def queued(self) -> int:
+        """Players in the leader's admission queue"""
+        return len(self.rooms.queue) if self.is_leader else self._index.get("queued", 0)
+
+    # Election
+
+    async def _election_loop(self):
+        while self._running:
+            await asyncio.sleep(self.lease_ms / 3000)
+            try:
+                await self._elect()
+            except Exception as e:
+                log.warning("⚠️ [CLUSTER] Leader election failed: %s: %s", type(e).__name__, e, extra={"sample_key": "election"})
+                if self.role == "leader" and time.monotonic() > self._lease_until:
+                    # Cannot prove we still hold the lease; another worker may have taken over
+                    await self._become_follower()
+
+    async def _elect(self):
+        renewed_at = time.monotonic()
+        if await self.backend.acquire_lease(self._key("leader"), self.worker_id, self.lease_ms):
+            self._lease_until = renewed_at + self.lease_ms / 1000
+            if self.role != "leader":
+                await self._become_leader()
+        elif self.role != "follower":
+            await self._become_follower()
+
+    async def _release_lease(self):
+        with suppress(Exception):
+            if await self.backend.get(self._key("leader")) == self.worker_id.encode():
+                await self.backend.delete(self._key("leader"))
+
+    async def _become_leader(self):
+        """
+        Take over the rounds; the role only becomes "leader" once the rooms started
+        If startup fails the lease is given back and this worker stays a follower.
+        """
+        await self._stop_role_tasks()
+        self.rooms.drop_replicas(set())
+        self.rooms.read_only = False
+        self.rooms.replica_default = None
+        self._published.clear()
+        self._index = {}
+        for future in self._pending.values():
+            if not future.done():
+                future.set_result((503, {"detail": "Leader changed, please retry"}))
+        try:
+            await self.rooms.startup()
+        except Exception:
+            self._lease_until = 0.0
+            await self._release_lease()
+            await self._become_follower()
+            raise
+        self.role = "leader"
+        log.info("👑 [CLUSTER] Worker %s is the leader", self.worker_id)
+        if self.backend.shared:
+            self._role_tasks = [
+                asyncio.create_task(self._publish_loop()),
+                asyncio.create_task(self._command_loop()),
+            ]
+
+    async def _become_follower(self):
+        was_leader = self.role == "leader"
+        await self._stop_role_tasks()
+        self.role = "follower"
+        if was_leader:
+            log.warning("⚠️ [CLUSTER] Worker %s lost leadership, stopping its rounds", self.worker_id)
+            await self.rooms.stand_down()
+        log.info("📡 [CLUSTER] Worker %s is a read-only follower", self.worker_id)
+        self.rooms.read_only = True
+        self._applied.clear()
+        self._index = {}
+        self._role_tasks = [
+            asyncio.create_task(self._replicate_loop()),
+            asyncio.create_task(self._reply_loop()),
+        ]
+
+    async def _stop_role_tasks(self):
+        for task in [*self._role_tasks, *self._command_tasks]:
+            task.cancel()
+        for task in [*self._role_tasks, *self._command_tasks]:
+            with suppress(asyncio.CancelledError):
+                await task
+        self._role_tasks = []
+        self._command_tasks.clear()
+
+    # Commands
+
+    async def _execute(self, command: str, args: List) -> CommandResult:
+        try:
+            return await self.handlers[command](*args)
+        except Exception as e:
+            log.error("❌ [CLUSTER] Command %s failed: %s: %s", command, type(e).__name__, e)
+            return 500, {"detail": "Internal server error"}
+
+    async def _forward(self, command: str, args: List, timeout: float) -> CommandResult:
+        request_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self.backend.rpush(self._key("commands"), json.dumps({
+                "id": request_id,
+                "command": command,
+                "args": args,
+                "reply_to": self.worker_id,
+                "expires": time.time() + timeout,  # The leader drops it once the caller gave up
+            }))
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return 504, {"detail": "Leader did not answer"}
+        except Exception as e:
+            log.warning("⚠️ [CLUSTER] Could not forward %s: %s: %s", command, type(e).__name__, e)
+            return 503, {"detail": "State backend unavailable"}
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _command_loop(self):
+        """Leader: take forwarded commands off the shared list, each answered in its own task"""
+        while True:
+            try:
+                raw = await self.backend.blpop(self._key("commands"), 1.0)
+            except Exception as e:
+                log.warning("⚠️ [CLUSTER] Command queue read failed: %s: %s", type(e).__name__, e, extra={"sample_key": "commands"})
+                await asyncio.sleep(1)
+                continue
+            if raw is None:
+                continue
+            try:
+                message = json.loads(raw)
+                if message["expires"] < time.time():
+                    continue
+            except (ValueError, KeyError, TypeError) as e:
+                # One malformed command must not stop the leader from serving the rest
+                log.warning("⚠️ [CLUSTER] Dropped a malformed command: %s: %s", type(e).__name__, e, extra={"sample_key": "bad_command"})
+                continue
+            task = asyncio.create_task(self._answer(message))
+            self._command_tasks.add(task)
+            task.add_done_callback(self._command_tasks.discard)
+
+    async def _answer(self, message: Dict):
+        status_code, body = await self._execute(message["command"], message["args"])
+        key = self._key("replies", message["reply_to"])
+        try:
+            await self.backend.rpush(key, json.dumps({"id": message["id"], "status": status_code, "body": body}))
+            # Replies to a worker that went away expire instead of piling up
+            await self.backend.expire(key, int(self.forward_timeout * 1000) + 60000)
+        except Exception as e:
+            log.warning("⚠️ [CLUSTER] Could not reply to %s: %s: %s", message["reply_to"], type(e).__name__, e, extra={"sample_key": "answer"})
+
+    async def _reply_loop(self):
+        """Follower: hand leader replies to the requests waiting on them"""
+        key = self._key("replies", self.worker_id)
+        while True:
+            try:
+                raw = await self.backend.blpop(key, 1.0)
+            except Exception as e:
+                log.warning("⚠️ [CLUSTER] Reply queue read failed: %s: %s", type(e).__name__, e, extra={"sample_key": "replies"})
+                await asyncio.sleep(1)
+                continue
+            if raw is None:
+                continue
+            try:
+                reply = json.loads(raw)
+                future = self._pending.get(reply["id"])
+                result = (reply["status"], reply["body"])
+            except (ValueError, KeyError, TypeError) as e:
+                log.warning("⚠️ [CLUSTER] Dropped a malformed reply: %s: %s", type(e).__name__, e, extra={"sample_key": "bad_reply"})
+                continue
+            if future is not None and not future.done():
+                future.set_result(result)
+
+    # Replication
+
+    async def _publish_loop(self):
+        while True:
+            try:
+                await self._publish()
+            except Exception as e:
+                log.warning("⚠️ [CLUSTER] State publish failed: %s: %s", type(e).__name__, e, extra={"sample_key": "publish"})
+            await asyncio.sleep(self.replication_interval)
+
+    async def _publish(self):
+        """Leader: push rooms whose state moved on, then a new index if anything changed"""
+        changed = False
+        for game_id, room in list(self.rooms.rooms.items()):
+            version = room.state_version
+            published = self._published.get(game_id)
+            if published is not None and published[0] == version:
+                continue
+            # State and ticks are taken together before any await; whatever the room
+            # records meanwhile has a newer version and goes out on the next pass
+            replica = json.dumps(room.export_replica())
+            restarted, ticks, cursor = self._pending_ticks(room, published[1] if published else 0)
+            key = self._key("room", game_id, "prices")
+            if restarted:
+                await self.backend.delete(key)
+            await self.backend.append(key, ticks, room.price_history_capacity)
+            await self.backend.set(self._key("room", game_id), replica)
+            self._published[game_id] = (version, cursor)
+            changed = True
+
+        for game_id in [game_id for game_id in self._published if game_id not in self.rooms.rooms]:
+            await self.backend.delete(self._key("room", game_id), self._key("room", game_id, "prices"))
+            del self._published[game_id]
+            changed = True
+
+        default = self.rooms.default_room_id()
+        queued = len(self.rooms.queue)
+        if changed or default != self._index.get("default") or queued != self._index.get("queued"):
+            self._index = {
+                "leader": self.worker_id,
+                "seq": self._index.get("seq", 0) + 1,
+                "default": default,
+                "queued": queued,
+                "rooms": {game_id: published[0] for game_id, published in self._published.items()},
+            }
+            await self.backend.set(self._key("index"), json.dumps(self._index))
+
+    @staticmethod
+    def _pending_ticks(room, last_cursor: int) -> Tuple[bool, List[bytes], int]:
+        """
+        The room's price ticks after last_cursor, packed for its replicated list
+        Returns (history restarted, ticks, cursor after the last tick). Runs without
+        awaiting, so the cursor is exactly the end of the ticks returned.
+        """
+        game = room.current_game
+        if game is None:
+            return False, [], 0
+        history = game.price_history
+        restarted = history.cursor < last_cursor  # The round began drawing
+        cursor = max(0 if restarted else last_cursor, history.first_cursor)
+        ticks = []
+        for timestamps, prices in history.segments(cursor):
+            for timestamp, price in zip(timestamps, prices):
+                ticks.append(TICK.pack(cursor, timestamp, price))
+                cursor += 1
+        return restarted, ticks, cursor
+
+    async def _replicate_loop(self):
+        while True:
+            try:
+                await self._replicate()
+            except Exception as e:
+                log.warning("⚠️ [CLUSTER] State replication failed: %s: %s", type(e).__name__, e, extra={"sample_key": "replicate"})
+            await asyncio.sleep(self.replication_interval)
+
+    async def _replicate(self):
+        """Follower: mirror every room whose version moved on since the last index"""
+        raw = await self.backend.get(self._key("index"))
+        if raw is None:
+            return
+        index = json.loads(raw)
+        if (index["leader"], index["seq"]) == (self._index.get("leader"), self._index.get("seq")):
+            return
+
+        for game_id, version in index["rooms"].items():
+            if self._applied.get(game_id) == version:
+                continue
+            raw_state = await self.backend.get(self._key("room", game_id))
+            if raw_state is None:
+                continue  # Retired since the index was written
+            state = json.loads(raw_state)
+            room = self.rooms.replica(game_id)
+            room.apply_replica(state, await self._fetch_ticks(game_id, room, state))
+            self._applied[game_id] = state["version"]
+
+        self.rooms.drop_replicas(set(index["rooms"]))
+        for game_id in [game_id for game_id in self._applied if game_id not in index["rooms"]]:
+            del self._applied[game_id]
+        self.rooms.replica_default = index["default"]
+        self._index = index
+
+    async def _fetch_ticks(self, game_id: str, room, state: Dict) -> List[Tuple[int, float, float]]:
+        """The replicated ticks this room's mirror is missing, up to the state's cursor"""
+        cursor = state["cursor"]
+        game = room.current_game
+        local = game.price_history.cursor if game is not None and state["game"] and game.game_id == state["game"]["game_id"] else 0
+        if cursor < local:
+            local = 0  # History restarted on the leader
+        if cursor <= local:
+            return []
+        count = min(cursor - local + TICK_SLACK, room.price_history_capacity)
+        entries = await self.backend.tail(self._key("room", game_id, "prices"), count)
+        ticks = [TICK.unpack(entry) for entry in entries]
+        return [tick for tick in ticks if local <= tick[0] < cursor]
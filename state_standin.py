@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Redis state backend
+Serves the handful of commands the worker coordinator uses (SET NX PX, GET,
+PEXPIRE, DEL, RPUSH, LTRIM, LRANGE, BLPOP, and EVAL of the lease-renewal
+script only) over RESP from an in-process store, so a multi-worker deployment
+can be run without a Redis server:
+
+    python state_standin.py --port 6379 &
+    STATE_BACKEND=redis uvicorn main:app --workers 4
+"""
+import argparse
+import asyncio
+
+from services.state_backend import RENEW_LEASE_SCRIPT, InProcessBackend
+
+
+def encode(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, bool):
+        return b":%d\r\n" % value
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        return b"+%s\r\n" % value.encode()
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item) for item in value)
+    if isinstance(value, Exception):
+        return b"-ERR %s\r\n" % str(value).encode()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+async def read_command(reader: asyncio.StreamReader):
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.split()  # Inline command, e.g. from redis-cli or telnet
+    args = []
+    for _ in range(int(line[1:-2])):
+        length = int((await reader.readline())[1:-2])
+        args.append((await reader.readexactly(length + 2))[:-2])
+    return args
+
+
+async def execute(store: InProcessBackend, args):
+    command = args[0].decode().upper()
+    keys = [arg.decode() for arg in args[1:2]]
+    if command == "PING":
+        return "PONG"
+    if command in ("AUTH", "SELECT"):
+        return "OK"
+    if command == "SET":
+        options = [arg.decode().upper() for arg in args[3:]]
+        ttl_ms = int(options[options.index("PX") + 1]) if "PX" in options else None
+        done = await store.set(keys[0], args[2], ttl_ms, only_if_absent="NX" in options)
+        return "OK" if done else None
+    if command == "GET":
+        return await store.get(keys[0])
+    if command == "PEXPIRE":
+        return int(await store.expire(keys[0], int(args[2])))
+    if command == "EVAL":
+        if args[1].decode() != RENEW_LEASE_SCRIPT:
+            return RuntimeError("only the lease renewal script is supported")
+        return int(await store.renew_lease(args[3].decode(), args[4].decode(), int(args[5])))
+    if command == "DEL":
+        await store.delete(*(arg.decode() for arg in args[1:]))
+        return len(args) - 1
+    if command == "RPUSH":
+        await store.rpush(keys[0], *args[2:])
+        return len(await store.lrange(keys[0], 0, -1))
+    if command == "LTRIM":
+        await store.ltrim(keys[0], int(args[2]), int(args[3]))
+        return "OK"
+    if command == "LRANGE":
+        return await store.lrange(keys[0], int(args[2]), int(args[3]))
+    if command == "BLPOP":
+        timeout = float(args[2])
+        value = await store.blpop(keys[0], timeout if timeout > 0 else 365 * 86400)
+        return None if value is None else [args[1], value]
+    return RuntimeError(f"unknown command '{command}'")
+
+
+async def start_server(host: str = "127.0.0.1", port: int = 6379) -> asyncio.AbstractServer:
+    """Serve a fresh in-process store on host:port (port 0 picks a free one)"""
+    store = InProcessBackend(shared=True)
+
+    async def serve(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while (args := await read_command(reader)) is not None:
+                try:
+                    reply = await execute(store, args)
+                except Exception as e:
+                    reply = e
+                writer.write(encode(reply))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(serve, host, port)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    options = parser.parse_args()
+
+    server = await start_server(options.host, options.port)
+    print(f"🗄️ State stand-in listening on {options.host}:{options.port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -86,7 +86,7 @@ def test_full_game_simulation():
     # Show final results
     print("\n📋 Final Results:")
     try:
-        response = requests.get(f"{BASE_URL}/game/info")
+        response = requests.get(f"{BASE_URL}/game/info", params={"uuid": participants[0]["uuid"]})
         if response.status_code == 200:
             info = response.json()
             print(json.dumps(info, indent=2))
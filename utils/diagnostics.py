@@ -0,0 +1,62 @@
+import logging
+import os
+import sys
+from typing import Dict, Optional
+
+# Loggers of this app's packages; LOG_LEVEL applies to these, not to third-party libraries
+APP_LOGGERS = ("api", "models", "services", "utils", "websocket")
+
+
+class SampleFilter(logging.Filter):
+    """
+    Lets through only the first and then every LOG_SAMPLE_EVERY-th record of a key
+    Records opt in with extra={"sample_key": key}; others always pass. Levels are
+    checked before filters run, so suppressed levels are neither counted nor formatted.
+    """
+
+    def __init__(self, sample_every: Optional[int] = None):
+        super().__init__()
+        self._sample_every = sample_every
+        self._counts: Dict[str, int] = {}
+
+    @property
+    def sample_every(self) -> int:
+        # Read on first use, so a .env loaded after import still applies
+        if self._sample_every is None:
+            self._sample_every = max(1, int(os.getenv("LOG_SAMPLE_EVERY", "100")))
+        return self._sample_every
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample_key", None)
+        if key is None:
+            return True
+        count = self._counts.get(key, 0) + 1
+        self._counts[key] = count
+        if count == 1 or count % self.sample_every == 0:
+            record.msg = f"{record.msg} (x%d)"
+            record.args = (*(record.args or ()), count)
+            return True
+        return False
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Module logger with sampling support (pass printf-style args, not f-strings)"""
+    logger = logging.getLogger(name)
+    if not any(isinstance(f, SampleFilter) for f in logger.filters):
+        logger.addFilter(SampleFilter())
+    return logger
+
+
+def configure_logging(level: Optional[str] = None):
+    """
+    Route the app's loggers to stdout at LOG_LEVEL (default info)
+    Called once at startup, after the environment has been loaded.
+    """
+    level_name = (level or os.getenv("LOG_LEVEL", "info")).upper()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    for name in APP_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.setLevel(getattr(logging, level_name, logging.INFO))
+        logger.handlers = [handler]
+        logger.propagate = False
@@ -1,81 +1,183 @@
 import asyncio
 import json
-from typing import List, Optional, Callable, Dict, Any
-from models.ball import BallAssignment
+import time
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+
+import websockets
+
+from utils.diagnostics import get_logger
+
+log = get_logger(__name__)
+
+
+class FillEvent:
+    """The parts of a userFills entry the game uses"""
+
+    __slots__ = ("oid", "sz", "px", "tid", "time", "received_at")
+
+    def __init__(self, oid: str, sz: float, px: float, tid: Optional[int], time_ms: int, received_at: float):
+        self.oid = oid
+        self.sz = sz
+        self.px = px
+        self.tid = tid
+        self.time = time_ms  # Exchange fill time (ms)
+        self.received_at = received_at  # time.monotonic() when the socket read returned
+
+
+def peek_user_fills(message) -> Optional[bool]:
+    """
+    Cheap pre-check on a raw frame: None if it is not a userFills message, else
+    whether it is flagged as a snapshot (judged from the head of the frame only)
+    """
+    head = message[:160]
+    if "userFills" not in head:
+        return None
+    return '"isSnapshot":true' in head or '"isSnapshot": true' in head
+
+
+def decode_user_fills(message, received_at: float) -> Tuple[bool, List[FillEvent]]:
+    """Decode a userFills frame into (is_snapshot, fill events)"""
+    data = json.loads(message).get("data", {})
+    fills = [
+        FillEvent(
+            str(fill.get("oid")),
+            float(fill.get("sz", 0.0)),
+            float(fill.get("px", 0.0)),
+            fill.get("tid"),
+            int(fill.get("time", 0)),
+            received_at,
+        )
+        for fill in data.get("fills", ())
+    ]
+    return bool(data.get("isSnapshot")), fills
+
 
 class HyperliquidWebSocketClient:
-    """WebSocket client for Hyperliquid order tracking"""
-    
-    def __init__(self):
+    """
+    Long-lived userFills subscription for the trading account
+    The connection is opened once and re-established with backoff. Every live fill
+    is pushed to each listener queue, so a round that starts listening before its
+    orders are placed cannot miss a fast fill. After a reconnect, fills from the
+    subscription snapshot that were not seen yet are delivered as well.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        user: str,
+        connect: Callable = websockets.connect,
+        recv_timeout: float = 60.0,
+    ):
+        self.ws_url = ws_url
+        self.user = user
+        self._connect = connect
+        self.recv_timeout = recv_timeout
         self.connected = False
-        self.subscribed_orders: List[str] = []
-        self.fill_callback: Optional[Callable] = None
-        self._monitoring_task: Optional[asyncio.Task] = None
-    
-    async def connect(self) -> bool:
-        """
-        Connect to Hyperliquid WebSocket
-        TODO: Implement actual WebSocket connection
-        """
-        # Simulate connection
-        await asyncio.sleep(0.1)
-        self.connected = True
-        print("Connected to Hyperliquid WebSocket")
-        return True
-    
-    async def disconnect(self):
-        """Disconnect from WebSocket"""
+        self.reconnects = 0
+        self._listeners: List[asyncio.Queue] = []
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self._has_connected = False
+        self._started_ms = 0  # Wall-clock ms at start(); older fills are history, never delivered
+        # Trade IDs already delivered, to de-duplicate snapshot replays
+        self._seen_tids = set()
+        self._seen_order = deque()
+        self._max_seen = 1000
+
+    def start(self):
+        """Start the background subscription if it is not running"""
+        if self._task is None or self._task.done():
+            self._running = True
+            self._started_ms = int(time.time() * 1000)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background subscription"""
+        # The flag also ends the loop if a cancel is lost while a recv is failing
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
         self.connected = False
-        if self._monitoring_task:
-            self._monitoring_task.cancel()
-        print("Disconnected from Hyperliquid WebSocket")
-    
-    async def subscribe_to_orders(self, order_ids: List[str], fill_callback: Callable):
-        """
-        Subscribe to order execution events
-        TODO: Implement actual WebSocket subscription
-        """
-        self.subscribed_orders = order_ids
-        self.fill_callback = fill_callback
-        
-        # Start monitoring task
-        self._monitoring_task = asyncio.create_task(self._monitor_orders())
-    
-    async def _monitor_orders(self):
-        """
-        Monitor order fills
-        TODO: Replace with actual WebSocket event handling
-        """
-        while self.connected and self.subscribed_orders:
+
+    def listen(self) -> asyncio.Queue:
+        """Get a queue that receives every fill from now on"""
+        queue = asyncio.Queue()
+        self._listeners.append(queue)
+        return queue
+
+    def remove_listener(self, queue: asyncio.Queue):
+        if queue in self._listeners:
+            self._listeners.remove(queue)
+
+    async def _run(self):
+        """Subscribe to userFills and reconnect with exponential backoff"""
+        backoff = 0.5
+        while self._running:
             try:
-                # Simulate WebSocket event processing
-                await asyncio.sleep(0.1)
-                
-                # Simulate random order fill
-                if self.subscribed_orders and self.fill_callback:
-                    import random
-                    if random.random() < 0.01:  # 1% chance per 100ms
-                        filled_order_id = random.choice(self.subscribed_orders)
-                        fill_price = random.uniform(44000, 46000)  # Simulated fill price
-                        
-                        fill_data = {
-                            "order_id": filled_order_id,
-                            "fill_price": fill_price,
-                            "timestamp": asyncio.get_event_loop().time()
-                        }
-                        
-                        await self.fill_callback(fill_data)
-                        break  # Stop monitoring after first fill
-                        
+                async with self._connect(self.ws_url) as ws:
+                    await ws.send(json.dumps({
+                        "method": "subscribe",
+                        "subscription": {"type": "userFills", "user": self.user},
+                    }))
+                    self.connected = True
+                    log.info("✅ [NETWORK] Fill stream subscribed: %s", self.ws_url)
+                    backoff = 0.5
+                    while self._running:
+                        message = await asyncio.wait_for(ws.recv(), self.recv_timeout)
+                        self._handle_message(message, time.monotonic())
             except asyncio.CancelledError:
-                break
+                raise
             except Exception as e:
-                print(f"WebSocket monitoring error: {e}")
-                await asyncio.sleep(1)
-    
-    async def unsubscribe_from_orders(self):
-        """Unsubscribe from order events"""
-        if self._monitoring_task:
-            self._monitoring_task.cancel()
-        self.subscribed_orders = []
-        self.fill_callback = None
+                log.warning("⚠️ [NETWORK] Fill stream error: %s: %s", type(e).__name__, e)
+            finally:
+                self.connected = False
+
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 10.0)
+
+    def _handle_message(self, message, received_at: float):
+        flagged_snapshot = peek_user_fills(message)
+        if flagged_snapshot is None:
+            log.debug("ℹ️ [NETWORK] Non-fill message on fill stream", extra={"sample_key": "other"})
+            return
+        if flagged_snapshot and not self._has_connected:
+            # The first snapshot is history from before startup - skipped without decoding
+            self._has_connected = True
+            return
+
+        is_snapshot, fills = decode_user_fills(message, received_at)
+        if is_snapshot and not self._has_connected:
+            self._has_connected = True
+            return
+
+        # A later snapshot may cover a disconnect: deliver what was not seen yet
+        for fill in fills:
+            if is_snapshot and fill.time < self._started_ms:
+                continue
+            if self._remember(fill):
+                self._publish(fill)
+        log.debug("📨 [NETWORK] Fill message with %d fills", len(fills), extra={"sample_key": "fills"})
+
+    def _remember(self, fill: FillEvent) -> bool:
+        """Record a fill's trade ID; False if it was already delivered"""
+        tid = fill.tid
+        if tid is None:
+            return True
+        if tid in self._seen_tids:
+            return False
+        self._seen_tids.add(tid)
+        self._seen_order.append(tid)
+        if len(self._seen_order) > self._max_seen:
+            self._seen_tids.discard(self._seen_order.popleft())
+        return True
+
+    def _publish(self, fill: FillEvent):
+        for queue in self._listeners:
+            queue.put_nowait(fill)